@@ -1,53 +1,663 @@
 import tkinter as tk
 from tkinter import messagebox
 from functools import partial
+import threading
+import argparse
+import asyncio
+import json
 import math
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the engines evaluate leaf children one at a time
+    np = None
 
 BOARD_SIZE = 15
 EMPTY_CELL = '.'
 
-
-class MiniMax:
-    def __init__(self, board, maximizer, minimizer, maxDepth = 1):
+# Transposition table bound types
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Zobrist keys per board size: {'X': [...], 'O': [...]} indexed by row * board_size + col
+_ZOBRIST_KEYS = {}
+# Mixed into the hash when the maximizer is to move, so both sides of a position get their own entry
+_MAXIMIZING_KEY = random.Random(0).getrandbits(64)
+
+
+def zobrist_keys(board_size):
+    keys = _ZOBRIST_KEYS.get(board_size)
+    if keys is None:
+        rng = random.Random(board_size)  # Fixed seed: the same position hashes the same in every process
+        keys = {symbol: [rng.getrandbits(64) for _ in range(board_size * board_size)] for symbol in ('X', 'O')}
+        _ZOBRIST_KEYS[board_size] = keys
+    return keys
+
+
+# Same scoring as Board.evaluate_direction, from the counts of each player's stones in a 5-cell window
+def _window_score(player_count, opp_count):
+    if opp_count == 0:
+        return (0, 0, 10, 50, 200, 0)[player_count]
+    if player_count == 0:
+        return (0, 0, -10, -50, -200, 0)[opp_count]
+    return 0
+
+
+# WINDOW_SCORES[x][o]: contribution of a window holding x 'X' stones and o 'O' stones, from X's point of view
+WINDOW_SCORES = [[_window_score(x, o) for o in range(6)] for x in range(6)]
+
+# Per board size: (list of 5-cell windows as cell indices, list of window indices through each cell)
+_WINDOWS = {}
+
+
+def board_windows(board_size):
+    windows = _WINDOWS.get(board_size)
+    if windows is None:
+        cells = []
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for r in range(board_size):
+                for c in range(board_size):
+                    if 0 <= r + 4 * dr < board_size and 0 <= c + 4 * dc < board_size:
+                        cells.append(tuple((r + i * dr) * board_size + c + i * dc for i in range(5)))
+        cell_windows = [[] for _ in range(board_size * board_size)]
+        for w, window in enumerate(cells):
+            for index in window:
+                cell_windows[index].append(w)
+        windows = (cells, cell_windows)
+        _WINDOWS[board_size] = windows
+    return windows
+
+
+# Per (board size, distance): for each cell, a bit mask (bit r * board_size + c) of the cells within
+# `distance` of it in every direction, the cell itself included
+_NEIGHBOUR_MASKS = {}
+
+
+def board_neighbour_masks(board_size, distance):
+    masks = _NEIGHBOUR_MASKS.get((board_size, distance))
+    if masks is None:
+        masks = []
+        for r in range(board_size):
+            for c in range(board_size):
+                mask = 0
+                for nr in range(max(0, r - distance), min(board_size, r + distance + 1)):
+                    for nc in range(max(0, c - distance), min(board_size, c + distance + 1)):
+                        mask |= 1 << (nr * board_size + nc)
+                masks.append(mask)
+        _NEIGHBOUR_MASKS[(board_size, distance)] = masks
+    return masks
+
+
+# Per board size: for each of the 8 rotations and reflections of the square, the cell index each cell maps to
+_SYMMETRIES = {}
+
+
+def board_symmetries(board_size):
+    symmetries = _SYMMETRIES.get(board_size)
+    if symmetries is None:
+        last = board_size - 1
+        transforms = (lambda r, c: (r, c), lambda r, c: (c, last - r), lambda r, c: (last - r, last - c),
+                      lambda r, c: (last - c, r), lambda r, c: (r, last - c), lambda r, c: (c, r),
+                      lambda r, c: (last - r, c), lambda r, c: (last - c, last - r))
+        symmetries = []
+        for transform in transforms:
+            mapping = []
+            for r in range(board_size):
+                for c in range(board_size):
+                    tr, tc = transform(r, c)
+                    mapping.append(tr * board_size + tc)
+            symmetries.append(mapping)
+        _SYMMETRIES[board_size] = symmetries
+    return symmetries
+
+
+# ---------------------------------<<   Line patterns   >> -----------------------------
+
+# What a stone placed on a cell makes along one line, weakest to strongest. A four has one cell
+# left to complete five, an open four two; a three can become a four, an open three an open four.
+# ONE means there is still room for five through the cell, NONE that the line is blocked.
+(PATTERN_NONE, PATTERN_ONE, PATTERN_TWO, PATTERN_OPEN_TWO, PATTERN_THREE, PATTERN_OPEN_THREE,
+ PATTERN_FOUR, PATTERN_OPEN_FOUR, PATTERN_FIVE) = range(9)
+
+# Lines are encoded two bits per cell (0 empty, 1 'X', 2 'O', 3 off the board) and padded with
+# PATTERN_REACH off-board cells at both ends, so the 9 cells centred on any board cell are one
+# 18-bit slice of its line code.
+PATTERN_REACH = 4
+PATTERN_CELL_BITS = {'X': 1, 'O': 2}
+PATTERN_WALL = 3
+PATTERN_MASK = (1 << (2 * (2 * PATTERN_REACH + 1))) - 1
+
+# Per board size: (initial code of every row, column and diagonal, per cell the (line, bit shift) in each direction)
+_LINES = {}
+
+
+def board_lines(board_size):
+    lines = _LINES.get(board_size)
+    if lines is None:
+        codes = []
+        cell_lines = [[] for _ in range(board_size * board_size)]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for r in range(board_size):
+                for c in range(board_size):
+                    if 0 <= r - dr < board_size and 0 <= c - dc < board_size:
+                        continue  # Not the first cell of its line
+                    length = 0
+                    while 0 <= r + length * dr < board_size and 0 <= c + length * dc < board_size:
+                        cell_lines[(r + length * dr) * board_size + c + length * dc].append(
+                            (len(codes), 2 * (length + PATTERN_REACH)))
+                        length += 1
+                    walls = (1 << (2 * PATTERN_REACH)) - 1
+                    codes.append(walls | walls << (2 * (length + PATTERN_REACH)))
+        lines = (codes, [tuple(cell) for cell in cell_lines])
+        _LINES[board_size] = lines
+    return lines
+
+
+# Pattern made by placing the centre stone of `cells` (9 cells: 0 empty, 1 own, 2 blocked; centre own)
+def _classify_line(cells):
+    spans = [cells[start:start + 5] for start in range(5)]  # Every 5 cells through the centre
+    if any(span.count(1) == 5 for span in spans):
+        return PATTERN_FIVE
+    if not any(2 not in span for span in spans):
+        return PATTERN_NONE
+    fives = _five_cells(cells)
+    if fives:
+        return PATTERN_OPEN_FOUR if len(fives) > 1 else PATTERN_FOUR
+    # Otherwise the pattern is named after the best one another stone on this line would make
+    followUps = [cells[:i] + (1,) + cells[i + 1:] for i, cell in enumerate(cells) if cell == 0]
+    fours = [len(_five_cells(after)) for after in followUps]
+    if fours and max(fours) > 1:
+        return PATTERN_OPEN_THREE
+    if fours and max(fours) == 1:
+        return PATTERN_THREE
+    threes = [_classify_line(after) for after in followUps]
+    if PATTERN_OPEN_THREE in threes:
+        return PATTERN_OPEN_TWO
+    if PATTERN_THREE in threes:
+        return PATTERN_TWO
+    return PATTERN_ONE
+
+
+# Empty cells of `cells` that would complete five through the centre
+def _five_cells(cells):
+    fives = set()
+    for start in range(5):
+        span = cells[start:start + 5]
+        if 2 not in span and span.count(0) == 1:
+            fives.add(start + span.index(0))
+    return fives
+
+
+PATTERN_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "line_patterns.bin")
+# The cached file starts with magic and version; bump the version whenever _classify_line, the pattern
+# constants or the code layout change, so tables written by older code are rebuilt instead of used
+PATTERN_TABLE_HEADER = struct.Struct("<8sH")
+PATTERN_TABLE_MAGIC = b"GOMOKUPT"
+PATTERN_TABLE_VERSION = 1
+_PATTERN_TABLE = None
+
+
+# PATTERN_TABLE[code] for the 18-bit code of 9 cells with an empty centre: the pattern 'X' makes by
+# playing the centre in the low nibble, the one 'O' makes in the high nibble. Built once (about a
+# second) and cached in PATTERN_TABLE_PATH; the table does not depend on the board size.
+def pattern_table():
+    global _PATTERN_TABLE
+    if _PATTERN_TABLE is not None:
+        return _PATTERN_TABLE
+    size = PATTERN_MASK + 1
+    header = PATTERN_TABLE_HEADER.pack(PATTERN_TABLE_MAGIC, PATTERN_TABLE_VERSION)
+    try:
+        with open(PATTERN_TABLE_PATH, "rb") as file:
+            data = file.read()
+        if data[:len(header)] == header and len(data) == len(header) + size:
+            _PATTERN_TABLE = data[len(header):]
+            return _PATTERN_TABLE
+    except OSError:
+        pass
+    # Classify each player's view once: own stones 1, empty 0, opponent stones and walls 2
+    views = {}
+    for code in range(3 ** 8):
+        cells = []
+        for _ in range(8):
+            code, digit = divmod(code, 3)
+            cells.append(digit)
+        cells.insert(PATTERN_REACH, 1)
+        views[tuple(cells)] = _classify_line(tuple(cells))
+    table = bytearray(size)
+    centre = 2 * PATTERN_REACH
+    for code in range(size):
+        if code >> centre & 3:
+            continue
+        digits = [code >> (2 * i) & 3 for i in range(2 * PATTERN_REACH + 1)]
+        digits[PATTERN_REACH] = None  # The centre, where the stone goes
+        x = tuple(1 if d in (1, None) else 0 if d == 0 else 2 for d in digits)
+        o = tuple(1 if d in (2, None) else 0 if d == 0 else 2 for d in digits)
+        table[code] = views[x] | views[o] << 4
+    _PATTERN_TABLE = bytes(table)
+    # Written under a per-process name and renamed into place, so a process starting at the same time
+    # never reads a half-written table
+    temporary = f"{PATTERN_TABLE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(header + _PATTERN_TABLE)
+        os.replace(temporary, PATTERN_TABLE_PATH)
+    except OSError:  # Read-only install: rebuild next time
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+    return _PATTERN_TABLE
+
+
+# ---------------------------------<< Batched evaluation >> -----------------------------
+
+# WINDOW_SCORES indexed by one code per window, x + 8 * o, so both counts come from a single sliding sum
+WINDOW_CODE_SCORES = (np.array([WINDOW_SCORES[code & 7][code >> 3] if (code & 7) + (code >> 3) <= 5 else 0
+                                for code in range(48)], dtype=np.int64) if np is not None else None)
+
+# Per board size: (cells, 20) array of the ids of the windows through each cell, in the order
+# batch_window_codes lays them out, padded with the id of an always-empty sentinel window
+_BATCH_WINDOWS = {}
+
+
+def batch_windows(board_size):
+    windows = _BATCH_WINDOWS.get(board_size)
+    if windows is None:
+        n, m = board_size, board_size - 4
+        cell_windows = [[] for _ in range(n * n)]
+        offset = 0
+        # Rows, columns, diagonals and anti-diagonals: (start rows, start columns, direction)
+        for rows, cols, (dr, dc) in ((range(n), range(m), (0, 1)), (range(m), range(n), (1, 0)),
+                                     (range(m), range(m), (1, 1)), (range(m), range(4, n), (1, -1))):
+            for r in rows:
+                for c in cols:
+                    for k in range(5):
+                        cell_windows[(r + k * dr) * n + c + k * dc].append(offset)
+                    offset += 1
+        windows = np.full((n * n, 20), offset, dtype=np.intp)  # `offset` is now the sentinel's id
+        for index, ids in enumerate(cell_windows):
+            windows[index, :len(ids)] = ids
+        _BATCH_WINDOWS[board_size] = windows
+    return windows
+
+
+# Code (x + 8 * o stone counts) of every 5-cell window of `cells` (int8 array: 1 'X', -1 'O', 0 empty),
+# from sliding sums along rows, columns and both diagonals, with the sentinel window last
+def batch_window_codes(cells):
+    m = cells.shape[0] - 4
+    stones = (cells == 1).view(np.int8) + ((cells == -1).view(np.int8) << 3)
+    parts = (sum(stones[:, k:k + m] for k in range(5)),
+             sum(stones[k:k + m, :] for k in range(5)),
+             sum(stones[k:k + m, k:k + m] for k in range(5)),
+             sum(stones[k:k + m, 4 - k:4 - k + m] for k in range(5)))
+    return np.concatenate([part.ravel() for part in parts] + [np.zeros(1, dtype=np.int8)])
+
+
+# Evaluates every child of a position at once: after each of `moves` (row, col) played by `symbol`,
+# the Board.score the child would have ('X' positive) and whether the move makes five
+def batch_evaluate(cells, moves, symbol):
+    size = cells.shape[0]
+    codes = batch_window_codes(cells)
+    windows = codes[batch_windows(size)[[row * size + col for row, col in moves]]]
+    if symbol == 'X':
+        step, own = 1, windows & 7
+    else:
+        step, own = 8, windows >> 3
+    gains = WINDOW_CODE_SCORES[windows + step] - WINDOW_CODE_SCORES[windows]
+    scores = WINDOW_CODE_SCORES[codes].sum() + gains.sum(axis=1)
+    return scores, (own == 4).any(axis=1)
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out."""
+
+
+class SearchCancelled(Exception):
+    """Raised by getBestMove when SearchEngine.cancel() stopped the search; the board is left as it was."""
+
+
+class SearchStats:
+    """Counters and timings of one getBestMove call.
+
+    `timings` (seconds in win detection, evaluation and move generation) is only filled when the
+    engine's `profile` flag is set, since timing every call slows the search down.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.evaluations = 0
+        self.moveGenerations = 0
+        self.seconds = 0.0
+        self.depth = 0
+        self.bestMove = None
+        self.bestScore = None
+        self.pv = []
+        self.perDepth = []  # (depth, seconds, nodes) spent in each finished iteration on its own
+        self.timings = {"win_check": 0.0, "evaluate": 0.0, "move_generation": 0.0}
+        self.fromBook = False  # The move came from the opening book, no search ran
+        self.threat = None  # "win", "block", "vcf" or "vct" when the threat search chose the move
+        self.iterations = 0  # Playouts of a Monte-Carlo search
+
+    @property
+    def nodesPerSecond(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    @property
+    def iterationsPerSecond(self):
+        return self.iterations / self.seconds if self.seconds else 0.0
+
+    # Growth of the node count from the previous iteration, or nodes ** (1 / depth) for a single one
+    @property
+    def branchingFactor(self):
+        if len(self.perDepth) >= 2 and self.perDepth[-2][2]:
+            return self.perDepth[-1][2] / self.perDepth[-2][2]
+        return self.nodes ** (1 / self.depth) if self.depth and self.nodes else 0.0
+
+    def summary(self):
+        if self.fromBook:
+            return f"book move {self.bestMove[0]},{self.bestMove[1]} | score {self.bestScore} | {self.seconds * 1e6:.0f}us"
+        if self.threat is not None:
+            return (f"{self.threat} {self.bestMove[0]},{self.bestMove[1]} | {self.nodes:,} threat nodes "
+                    f"in {self.seconds * 1000:.1f}ms")
+        pv = " ".join(f"{r},{c}" for r, c in self.pv)
+        if self.iterations:
+            return (f"{self.iterations:,} playouts in {self.seconds:.2f}s ({self.iterationsPerSecond:,.0f}/s) | "
+                    f"win rate {self.bestScore:.2f} | depth {self.depth} | pv {pv}")
+        return (f"depth {self.depth} | score {self.bestScore} | {self.nodes:,} nodes in {self.seconds:.2f}s "
+                f"({self.nodesPerSecond:,.0f}/s) | {self.cutoffs:,} cutoffs | ebf {self.branchingFactor:.1f} | pv {pv}")
+
+    def as_dict(self):
+        return {"nodes": self.nodes, "cutoffs": self.cutoffs, "evaluations": self.evaluations,
+                "move_generations": self.moveGenerations, "seconds": self.seconds, "depth": self.depth,
+                "best_move": self.bestMove, "best_score": self.bestScore, "pv": self.pv,
+                "per_depth": self.perDepth, "branching_factor": self.branchingFactor, "timings": self.timings,
+                "from_book": self.fromBook, "threat": self.threat, "iterations": self.iterations,
+                "iterations_per_second": self.iterationsPerSecond}
+
+
+class SearchHooks:
+    """Callbacks an engine makes during getBestMove; subclass and override the ones you need.
+
+    on_node runs in the innermost loop, so engines only call it for hooks that override it.
+    """
+
+    def on_search_start(self, engine):
+        pass
+
+    def on_iteration(self, engine, depth, stats):
+        pass
+
+    def on_node(self, engine, depth):
+        pass
+
+    def on_search_end(self, engine, move, stats):
+        pass
+
+
+class JsonLinesExporter(SearchHooks):
+    """Appends the stats of every search to a file, one JSON object per line."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def on_search_end(self, engine, move, stats):
+        with open(self.path, "a") as file:
+            file.write(json.dumps(dict(stats.as_dict(), engine=type(engine).__name__)) + "\n")
+
+
+class SearchEngine:
+    """Stats, hooks and profiling shared by the search engines."""
+
+    def __init__(self):
+        self.stats = SearchStats()
+        self.hooks = []
+        self.nodeHooks = []  # The hooks that override on_node
+        self.profile = False
+        self.searchStart = 0.0
+        self.cancelled = False
+        self.book = None  # OpeningBook consulted before searching, see bookMove
+        self.batchEvaluation = True  # Score the leaf children of depth-1 nodes with one NumPy batch
+        self.threats = None  # ThreatSearch run before the main search, see threatMove
+
+    # Safe to call from another thread: the search stops at its next check and getBestMove raises SearchCancelled.
+    # A cancel that arrives before the search starts stops that search; the flag stays set until a search
+    # raises SearchCancelled or clearCancel is called.
+    def cancel(self):
+        self.cancelled = True
+
+    # Drops a cancel that no search has consumed, before starting a search that must run
+    def clearCancel(self):
+        self.cancelled = False
+
+    def addHook(self, hook):
+        self.hooks.append(hook)
+        if type(hook).on_node is not SearchHooks.on_node:
+            self.nodeHooks.append(hook)
+
+    def startSearch(self):
+        self.stats = SearchStats()
+        self.searchStart = time.perf_counter()
+        if self.profile:
+            self._installProfiler()
+        for hook in self.hooks:
+            hook.on_search_start(self)
+
+    # Answers from the opening book when it knows the position and the maximizer is the side to move
+    # (X moves first). Finishes the search and returns the move, or returns None to search normally.
+    def bookMove(self):
+        if self.book is None:
+            return None
+        toMove = 'X' if self.board.stone_count % 2 == 0 else 'O'
+        if self.maximizer.symbol != toMove:
+            return None
+        move = self.book.lookup(self.board)
+        if move is not None:
+            self.stats.fromBook = True
+            self.finishSearch(move, self.book.lastScore, 0, 0, [move])
+        return move
+
+    # Finishes the search with the threat search's move when it found a win or a must-block, else returns None.
+    # `deadline` (time.perf_counter seconds) is the end of the move's time budget, which the threat search shares.
+    def threatMove(self, deadline=None):
+        if self.threats is None:
+            return None
+        move, kind = self.threats.solve(self.maximizer.symbol, self.minimizer.symbol, deadline)
+        self.nodes += self.threats.nodes
+        if move is not None:
+            self.stats.threat = kind
+            self.finishSearch(move, None if kind == "block" else 1, 0, self.nodes, [move])
+        return move
+
+    # Batches need NumPy, and are skipped when node hooks or the profiler have to see every leaf
+    def batchLeaves(self):
+        return self.batchEvaluation and np is not None and not self.nodeHooks and not self.profile
+
+    # `nodes` counts from the start of the search; perDepth keeps each iteration's own time and nodes
+    def finishIteration(self, depth, nodes):
+        perDepth = self.stats.perDepth
+        seconds = time.perf_counter() - self.searchStart - sum(entry[1] for entry in perDepth)
+        perDepth.append((depth, seconds, nodes - sum(entry[2] for entry in perDepth)))
+        for hook in self.hooks:
+            hook.on_iteration(self, depth, self.stats)
+
+    def finishSearch(self, move, score, depth, nodes, pv):
+        if self.profile:
+            self._removeProfiler()
+        stats = self.stats
+        stats.seconds = time.perf_counter() - self.searchStart
+        stats.bestMove, stats.bestScore, stats.depth, stats.nodes, stats.pv = move, score, depth, nodes, pv
+        for hook in self.hooks:
+            hook.on_search_end(self, move, stats)
+
+    # Puts the board back to `historyLength` moves after a cancelled search
+    def abortSearch(self, historyLength):
+        self.cancelled = False  # This search consumed the cancel
+        while len(self.board.history) > historyLength:
+            self.board.undo_move()
+        if self.profile:
+            self._removeProfiler()
+
+    # Times the hot board calls by shadowing them with instance attributes for the length of a search
+    _PROFILED = (("is_winning_move", "win_check"), ("evaluate", "evaluate"),
+                 ("get_candidate_moves", "move_generation"), ("get_empty_cells", "move_generation"))
+
+    def _installProfiler(self):
+        timings = self.stats.timings
+
+        def timed(fn, name):
+            def wrapper(*args):
+                start = time.perf_counter()
+                try:
+                    return fn(*args)
+                finally:
+                    timings[name] += time.perf_counter() - start
+            return wrapper
+
+        for method, name in self._PROFILED:
+            setattr(self.board, method, timed(getattr(self.board, method), name))
+        if hasattr(self, "orderMoves"):
+            self.orderMoves = timed(self.orderMoves, "move_generation")
+
+    def _removeProfiler(self):
+        for method, _ in self._PROFILED:
+            self.board.__dict__.pop(method, None)
+        self.__dict__.pop("orderMoves", None)
+
+
+class MiniMax(SearchEngine):
+    def __init__(self, board, maximizer, minimizer, maxDepth = 1, workers=None, book=None, batchEvaluation=True):
+        super().__init__()
+        self.book = book # Optional OpeningBook, tried before every search
+        self.batchEvaluation = batchEvaluation # Score the children of depth-1 nodes in one NumPy batch
         self.board = board # Instance of the current board state
         self.maximizer = maximizer # Player 'O', trie to maximize their score
         self.minimizer = minimizer # Opponent 'X', trie to minimze the maximizer score
         self.maxDepth = maxDepth # Maximum number of moves to explore
+        self.workers = workers # Processes for the parallel root search, None or 1 searches serially
+        self.pool = None
+        self.nodes = 0 # Positions visited by the last search
 
     def getBestMove(self):
+        self.nodes = 0
+        self.startSearch()
+        bookMove = self.bookMove()
+        if bookMove is not None:
+            return bookMove
+        historyLength = len(self.board.history)
+        try:
+            if self.workers and self.workers > 1:
+                bestMove, bestScore = self.getBestMoveParallel()
+            else:
+                bestMove, bestScore = self.searchRoot()
+        except SearchCancelled:
+            self.abortSearch(historyLength)
+            raise
+        self.finishIteration(self.maxDepth, self.nodes)
+        self.finishSearch(bestMove, bestScore, self.maxDepth, self.nodes, [bestMove] if bestMove else [])
+        return bestMove # return the best move for the maximizer
+
+    def searchRoot(self):
         bestScore = -math.inf # MIN_INT
         bestMove = None
 
-        for row, col in self.board.get_empty_cells(): # Iterate over all empty cells
+        moves = self.board.get_empty_cells()
+        if self.maxDepth == 1 and moves and self.batchLeaves(): # Every child is a leaf: score them in one batch
+            scores = self.leafScores(moves, self.maximizer.symbol)
+            bestScore = max(scores)
+            return moves[scores.index(bestScore)], bestScore # The first best move, as the loop below picks
+
+        for row, col in moves: # Iterate over all empty cells
             self.board.make_move(row, col, self.maximizer.symbol) # Make move
             score = self.minimax(self.maxDepth - 1, False) # Get the best
-            self.board.grid[row][col] = EMPTY_CELL  # Undo move
+            self.board.undo_move()  # Undo move
 
             if score > bestScore: # If this is the maximum score 
                 bestScore = score
                 bestMove = (row, col) # Get its cell
 
-        return bestMove # return the best move for the maximizer
+        return bestMove, bestScore
+
+    # Splits the root moves into ordered chunks, one task each, and keeps the first best move like getBestMove
+    def getBestMoveParallel(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        rootMoves = self.board.get_empty_cells()
+        chunkSize = max(1, len(rootMoves) // (self.workers * 4))
+        chunks = [rootMoves[i:i + chunkSize] for i in range(0, len(rootMoves), chunkSize)]
+        moves = self.board.move_list()
+        tasks = [(type(self.board), self.board.board_size, moves, self.maximizer, self.minimizer, self.maxDepth, chunk)
+                 for chunk in chunks]
+
+        bestScore = -math.inf # MIN_INT
+        bestMove = None
+        for chunk, (scores, nodes) in zip(chunks, self.pool.map(_search_minimax_moves, tasks)):
+            if self.cancelled:
+                raise SearchCancelled
+            self.nodes += nodes
+            for move, score in zip(chunk, scores):
+                if score > bestScore:
+                    bestScore = score
+                    bestMove = move
+        return bestMove, bestScore
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # What minimax(0, ...) returns for the child after each move by `symbol`: only wins score at a leaf
+    def leafScores(self, moves, symbol):
+        if self.cancelled:  # The batch skips the check minimax makes at every node
+            raise SearchCancelled
+        _, wins = batch_evaluate(self.board.to_array(), moves, symbol)
+        self.nodes += len(moves)
+        value = 1 if symbol == self.maximizer.symbol else -1
+        scores = [value if win else 0 for win in wins.tolist()]
+        self.stats.evaluations += scores.count(0)
+        return scores
 
     # Algorithm to determine the best move of a player
     # Maximize the player score
     # Minimze the opponent score
     # Based on DFS "try all possible future moves", but limited to the depth 
     def minimax(self, depth, isMaximizing):
+        self.nodes += 1
+        if self.cancelled:
+            raise SearchCancelled
+        if self.nodeHooks:
+            for hook in self.nodeHooks:
+                hook.on_node(self, depth)
         # Base cases
-        if self.board.check_winner(self.maximizer.symbol): # If maximizer wins
+        if self.board.winner == self.maximizer.symbol: # If maximizer wins
             return 1
-        elif self.board.check_winner(self.minimizer.symbol): # If minimizer wins
+        elif self.board.winner == self.minimizer.symbol: # If minimizer wins
             return -1
-        elif depth == 0 or not self.board.get_empty_cells(): # If no more depth or the game is over
+        elif depth == 0 or self.board.is_full(): # If no more depth or the game is over
+            self.stats.evaluations += 1
             return 0  # Draw or depth limit
 
+        self.stats.moveGenerations += 1
+
+        if depth == 1 and self.batchLeaves(): # The children are leaves: score them in one batch
+            moves = self.board.get_empty_cells()
+            scores = self.leafScores(moves, self.maximizer.symbol if isMaximizing else self.minimizer.symbol)
+            return max(scores) if isMaximizing else min(scores)
+
         if isMaximizing: # Maximizer turn
             bestScore = -math.inf # MIN_INT
             for row, col in self.board.get_empty_cells(): # Iterate over all possible moves
                 self.board.make_move(row, col, self.maximizer.symbol) # Make a move
                 score = self.minimax(depth - 1, False) # Switch to the opponent turn
-                self.board.grid[row][col] = EMPTY_CELL # Backtrack to make the cell empty again
+                self.board.undo_move() # Backtrack to make the cell empty again
                 bestScore = max(score, bestScore) # Track the max score 
             return bestScore
         else: # Minimizer turn
@@ -55,66 +665,1030 @@ class MiniMax:
             for row, col in self.board.get_empty_cells(): # Iterate over all possible moves
                 self.board.make_move(row, col, self.minimizer.symbol) # Make a move
                 score = self.minimax(depth - 1, True) # Switch to the player turn
-                self.board.grid[row][col] = EMPTY_CELL # Backtrack to make the cell empty again
+                self.board.undo_move() # Backtrack to make the cell empty again
                 bestScore = min(score, bestScore) # Track the min score 
             return bestScore
 
-class AlphaBeta:
-    def __init__(self, board, maximizer, minimizer, maxDepth=2):
+# Move ordering weights, indexed by the line pattern (PATTERN_*) the candidate makes for the mover
+# (ATTACK) or would have made for the opponent (DEFENCE), summed over the 4 lines through the cell
+ATTACK_WEIGHTS = (0, 1, 4, 10, 40, 400, 1000, 1 << 20, 1 << 24)
+DEFENCE_WEIGHTS = (0, 0, 2, 6, 25, 300, 600, 1 << 19, 1 << 22)
+KILLER_BONUS = 1 << 18
+# Fewest children for which a depth-1 alpha-beta node uses batch_evaluate instead of visiting them one by one
+BATCH_MIN_MOVES = 24
+TT_MOVE_BONUS = 1 << 26
+
+
+class TranspositionTable:
+    """Fixed-size cache of searched positions keyed by Zobrist hash.
+
+    Each bucket has two slots: a depth-preferred slot that only gives way to an equal or
+    deeper search, and an always-replace slot that takes whatever the first one rejected.
+    Entries are tuples (key, depth, flag, value, best_move).
+    """
+
+    def __init__(self, max_entries=1 << 18):
+        self.buckets = max(1, max_entries // 2)
+        self.depth_slots = [None] * self.buckets
+        self.recent_slots = [None] * self.buckets
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stores = 0
+
+    def lookup(self, key):
+        index = key % self.buckets
+        entry = self.depth_slots[index]
+        if entry is None or entry[0] != key:
+            entry = self.recent_slots[index]
+            if entry is None or entry[0] != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, value, best_move):
+        index = key % self.buckets
+        entry = (key, depth, flag, value, best_move)
+        self.stores += 1
+        current = self.depth_slots[index]
+        if current is None or current[0] == key or depth >= current[1]:
+            if current is not None and current[0] != key:
+                self.evictions += 1
+            self.depth_slots[index] = entry
+        else:
+            current = self.recent_slots[index]
+            if current is not None and current[0] != key:
+                self.evictions += 1
+            self.recent_slots[index] = entry
+
+    def clear(self):
+        self.depth_slots = [None] * self.buckets
+        self.recent_slots = [None] * self.buckets
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "stores": self.stores,
+                "capacity": 2 * self.buckets}
+
+
+class OpeningBook:
+    """Read-only opening book: best moves keyed by canonical position hash (Board.canonical_hash).
+
+    The file is a header (magic, board size, record count) followed by fixed-size records
+    (hash, move cell in the canonical orientation, score) sorted by hash. It is memory-mapped and
+    binary-searched, so lookups read a few pages and every process opening it shares the OS page cache.
+    """
+
+    MAGIC = b"GOMOKUBK"
+    HEADER = struct.Struct("<8sHI")
+    RECORD = struct.Struct("<QHi")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.board_size, self.count = self.HEADER.unpack_from(self.data, 0)
+        if magic != self.MAGIC or len(self.data) != self.HEADER.size + self.count * self.RECORD.size:
+            self.data.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.hits = 0
+        self.misses = 0
+        self.lastScore = None  # Stored score of the last move returned by lookup
+
+    # entries: {canonical hash: (canonical cell index, score)}
+    @classmethod
+    def write(cls, path, board_size, entries):
+        with open(path, "wb") as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, board_size, len(entries)))
+            for key in sorted(entries):
+                file.write(cls.RECORD.pack(key, *entries[key]))
+
+    # (canonical cell index, score) stored for `key`, or None
+    def probe(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record = self.RECORD.unpack_from(self.data, self.HEADER.size + middle * self.RECORD.size)
+            if record[0] < key:
+                low = middle + 1
+            elif record[0] > key:
+                high = middle
+            else:
+                return record[1], record[2]
+        return None
+
+    # Book move (row, col) for the side to move on `board` (X moves first), or None
+    def lookup(self, board):
+        if board.board_size != self.board_size or board.winner is not None:
+            return None
+        key, transform = board.canonical_hash()
+        entry = self.probe(key)
+        if entry is not None:
+            # The stored cell is in the canonical orientation: find the cell of this board that maps onto it
+            index = board_symmetries(board.board_size)[transform].index(entry[0])
+            row, col = divmod(index, board.board_size)
+            if board.is_valid_move(row, col):
+                self.hits += 1
+                self.lastScore = entry[1]
+                return row, col
+        self.misses += 1
+        return None
+
+    def close(self):
+        self.data.close()
+
+
+# Opening book loaded by the GUI and console games when the file exists (build it with the `book` command)
+OPENING_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+_OPENING_BOOKS = {}
+
+
+# The opening book at `path` (opened once per process), or None when there is none
+def load_opening_book(path=OPENING_BOOK):
+    if path not in _OPENING_BOOKS:
+        try:
+            _OPENING_BOOKS[path] = OpeningBook(path)
+        except (OSError, ValueError):
+            _OPENING_BOOKS[path] = None
+    return _OPENING_BOOKS[path]
+
+
+class ThreatSearch:
+    """Threat-space search for forced wins, run before the main search.
+
+    The attacker only plays threats: fours (a window with four of its stones and one empty cell)
+    and, in the shallower VCT pass, threes that leave a cell completing two fours at once. The
+    defender only gets the moves that can answer them: the winning cell of a four, or against a three
+    the empty cells of the attacker's three-stone windows and its own fours. Solved positions are
+    cached per (hash, attacker), and each solve stops after `maxNodes` nodes or `timeLimit` milliseconds.
+    """
+
+    def __init__(self, board, maxNodes=5000, timeLimit=50, vcfDepth=10, vctDepth=3, cacheSize=1 << 16):
+        self.board = board
+        self.maxNodes = maxNodes
+        self.timeLimit = timeLimit
+        self.vcfDepth = vcfDepth  # Attacker moves in a sequence of fours
+        self.vctDepth = vctDepth  # Attacker moves in a sequence of fours and threes, 0 to skip threes
+        self.cacheSize = cacheSize
+        self.cache = {}  # (hash, attacker) -> (depth, winning cell or None, threes allowed)
+        self.nodes = 0
+        self.deadline = None
+        self.aborted = False  # The last solve ran out of nodes or time
+
+    # Sets of empty cell indices, by the window counts they would raise:
+    # {count: cells} for windows free of `defender` stones holding `count` of the attacker's (count >= minCount),
+    # and {count: cells} for windows free of attacker stones holding `count` (>= 3) of the defender's
+    def scan(self, attacker, defender, minCount=3):
+        board = self.board
+        stones = board.stone_mask
+        windows = board.windows
+        own = {count: set() for count in range(minCount, 5)}
+        their = {3: set(), 4: set()}
+        for w, (mine, other) in enumerate(zip(board.window_counts[attacker], board.window_counts[defender])):
+            if other == 0:
+                if mine >= minCount:
+                    own[mine].update(index for index in windows[w] if not stones >> index & 1)
+            elif mine == 0 and other >= 3:
+                their[other].update(index for index in windows[w] if not stones >> index & 1)
+        return own, their
+
+    # Cells where `symbol`, after playing `index`, completes five with a window through `index`
+    def gains(self, index, symbol, opponent):
+        board = self.board
+        own, other = board.window_counts[symbol], board.window_counts[opponent]
+        cells = set()
+        for w in board.cell_windows[index]:
+            if own[w] == 4 and other[w] == 0:
+                cells.update(cell for cell in board.windows[w] if not board.stone_mask >> cell & 1)
+        return cells
+
+    # True when some empty cell would give `symbol` two or more winning cells (an open or double four)
+    def hasDoubleThreat(self, symbol, opponent):
+        board = self.board
+        windows = board.windows
+        gains = {}
+        for w, (own, other) in enumerate(zip(board.window_counts[symbol], board.window_counts[opponent])):
+            if own == 3 and other == 0:
+                first, second = [index for index in windows[w] if not board.stone_mask >> index & 1]
+                gains.setdefault(first, set()).add(second)
+                gains.setdefault(second, set()).add(first)
+        return any(len(cells) > 1 for cells in gains.values())
+
+    # (move, kind): an immediate win, a forced block of the opponent's five, or the first move of a
+    # forced win ("vcf" with fours only, "vct" with threes). (None, None) when nothing was found in budget.
+    # `deadline` (time.perf_counter seconds) stops the solve earlier than timeLimit would.
+    def solve(self, attacker, defender, deadline=None):
+        board = self.board
+        self.nodes = 0
+        self.aborted = False
+        if board.winner is not None:
+            return None, None
+        size = board.board_size
+        own, their = self.scan(attacker, defender)
+        if own[4]:
+            return divmod(min(own[4]), size), "win"
+        if their[4]:
+            return divmod(min(their[4]), size), "block"
+        self.deadline = time.perf_counter() + self.timeLimit / 1000 if self.timeLimit is not None else None
+        if deadline is not None:
+            self.deadline = deadline if self.deadline is None else min(self.deadline, deadline)
+        historyLength = len(board.history)
+        if len(self.cache) > self.cacheSize:
+            self.cache.clear()
+        try:
+            for depth, threes, kind in ((self.vcfDepth, False, "vcf"), (self.vctDepth, True, "vct")):
+                if depth > 0:
+                    move = self.attack(attacker, defender, depth, threes)
+                    if move is not None:
+                        return divmod(move, size), kind
+        except SearchTimeout:
+            self.aborted = True
+            while len(board.history) > historyLength:
+                board.undo_move()
+        finally:
+            self.deadline = None
+        return None, None
+
+    # Winning cell index for `attacker` (to move) within `depth` threats, or None
+    def attack(self, attacker, defender, depth, threes):
+        board = self.board
+        self.nodes += 1
+        if self.nodes > self.maxNodes or (self.deadline is not None and time.perf_counter() > self.deadline):
+            raise SearchTimeout()
+        own, their = self.scan(attacker, defender, 2 if threes else 3)
+        if own[4]:
+            return min(own[4])
+        if len(their[4]) > 1 or depth == 0:
+            return None
+        key = (board.hash, attacker)
+        cached = self.cache.get(key)
+        if cached is not None:
+            cachedDepth, cachedMove, cachedThrees = cached
+            # A win stands in any search allowing the same threats; a failure only in a search no deeper or wider
+            if cachedMove is not None and (threes or not cachedThrees):
+                return cachedMove
+            if cachedMove is None and cachedDepth >= depth and (cachedThrees or not threes):
+                return None
+
+        size = board.board_size
+        result = None
+        # A four forces the block on its winning cell; two winning cells cannot both be blocked.
+        # Facing a four, only a four that also blocks it keeps the initiative.
+        for index in sorted(own[3] & their[4] if their[4] else own[3]):
+            board.make_move(*divmod(index, size), attacker)
+            gains = self.gains(index, attacker, defender)
+            won = len(gains) > 1
+            if not won:
+                board.make_move(*divmod(gains.pop(), size), defender)
+                won = board.winner is None and self.attack(attacker, defender, depth - 1, threes) is not None
+                board.undo_move()
+            board.undo_move()
+            if won:
+                result = index
+                break
+
+        # A three threatens an open four, so the defender must answer it at once (or play a four of its own)
+        if result is None and threes and not their[4]:
+            shift = 0 if attacker == 'X' else 4
+            for index in sorted(own[2] - own[3]):
+                # Only cells making an open three, or threes on two lines, can leave a double threat
+                patterns = [entry >> shift & 15 for entry in board.line_patterns(*divmod(index, size))]
+                if PATTERN_OPEN_THREE not in patterns and sum(p >= PATTERN_THREE for p in patterns) < 2:
+                    continue
+                board.make_move(*divmod(index, size), attacker)
+                if self.hasDoubleThreat(attacker, defender):
+                    replies, counters = self.scan(attacker, defender)
+                    won = True
+                    for reply in sorted(replies[3] | counters[3]):
+                        board.make_move(*divmod(reply, size), defender)
+                        won = board.winner is None and self.attack(attacker, defender, depth - 1, threes) is not None
+                        board.undo_move()
+                        if not won:
+                            break
+                    if won:
+                        result = index
+                board.undo_move()
+                if result is not None:
+                    break
+
+        self.cache[key] = (depth, result, threes)
+        return result
+
+
+class AlphaBeta(SearchEngine):
+    def __init__(self, board, maximizer, minimizer, maxDepth=2, ttSize=1 << 18, timeLimit=None,
+                 moveOrdering=True, workers=None, book=None, threatSearch=True, batchEvaluation=True):
+        super().__init__()
+        self.batchEvaluation = batchEvaluation  # Score the children of depth-1 nodes in one NumPy batch
+        # Looks for immediate wins, must-blocks and forced wins before the main search, None to skip it
+        self.threats = ThreatSearch(board) if threatSearch else None
+        self.book = book  # Optional OpeningBook, tried before every search
         self.board = board
         self.maximizer = maximizer
         self.minimizer = minimizer
         self.maxDepth = maxDepth
+        # Kept for the life of the engine, so positions searched on earlier turns are reused
+        self.tt = TranspositionTable(ttSize) if ttSize else None
+        self.timeLimit = timeLimit  # Milliseconds per move; None searches exactly maxDepth plies
+        self.deadline = None
+        self.nodes = 0
+        self.completedDepth = 0  # Depth of the last finished iteration
+        self.bestScore = None
+        self.pv = []  # Principal variation of the last finished iteration
+        # Score of every root move in the last finished iteration (bounds only, except for the best move)
+        self.rootScores = {}
+        self.moveOrdering = moveOrdering
+        self.rootDepth = 0
+        self.killers = []  # Two moves per ply that recently caused a beta cutoff
+        # Cutoff counts per player and cell, kept across iterations and halved before every move
+        self.historyTable = {'X': [0] * (board.board_size ** 2), 'O': [0] * (board.board_size ** 2)}
+        self.workers = workers  # Processes for the parallel root search, None or 1 searches serially
+        self.pool = None
+        self.rootBound = None  # Best root score so far, shared with the worker processes
+
+    # With a time limit the search deepens one ply at a time until the budget runs out (maxDepth is
+    # ignored) and returns the best move of the deepest iteration that finished
+    def getBestMove(self, timeLimit=None):
+        timeLimit = self.timeLimit if timeLimit is None else timeLimit
+        for table in self.historyTable.values():
+            for i in range(len(table)):
+                table[i] >>= 1
+        self.nodes = 0
+        self.deadline = None
+        self.startSearch()
+        bookMove = self.bookMove()
+        if bookMove is not None:
+            return bookMove
+        threatMove = self.threatMove(self.searchStart + timeLimit / 1000 if timeLimit is not None else None)
+        if threatMove is not None:
+            return threatMove
+        historyLength = len(self.board.history)
+        try:
+            bestMove = self.searchFixedDepth() if timeLimit is None else self.searchIterative(timeLimit)
+        except SearchCancelled:
+            self.abortSearch(historyLength)
+            raise
+        finally:
+            self.deadline = None
+        self.finishSearch(bestMove, self.bestScore, self.completedDepth, self.nodes, self.pv)
+        return bestMove
 
-    def getBestMove(self):
+    def searchFixedDepth(self):
+        rootMoves = self.orderMoves(self.board.get_candidate_moves(), self.maximizer.symbol, 0)
+        bestMove, self.bestScore, self.rootScores = self.searchRoot(self.maxDepth, rootMoves)
+        self.completedDepth = self.maxDepth
+        self.pv = self.principalVariation(bestMove)
+        self.finishIteration(self.maxDepth, self.nodes)
+        return bestMove
+
+    def searchIterative(self, timeLimit):
+        rootMoves = self.orderMoves(self.board.get_candidate_moves(), self.maximizer.symbol, 0)
+        start = self.searchStart  # The budget covers the book lookup and threat search too
+        historyLength = len(self.board.history)
+        bestMove = None
+        depth = 1
+        while depth <= self.board.board_size * self.board.board_size - self.board.stone_count:
+            # Depth 1 always finishes so there is a move to return
+            self.deadline = start + timeLimit / 1000 if depth > 1 else None
+            try:
+                bestMove, self.bestScore, scores = self.searchRoot(depth, rootMoves)
+                self.rootScores = scores
+            except SearchTimeout:
+                while len(self.board.history) > historyLength:
+                    self.board.undo_move()
+                break
+            self.completedDepth = depth
+            self.pv = self.principalVariation(bestMove)
+            self.finishIteration(depth, self.nodes)
+            # The previous iteration's principal move goes first, the rest by their scores
+            rootMoves = sorted(rootMoves, key=lambda move: (move != bestMove, -scores[move]))
+            if time.perf_counter() >= start + timeLimit / 1000:
+                break
+            depth += 1
+        return bestMove
+
+    # Exact scores of `moves` for the maximizer, each searched with a full window to `depth` plies
+    # (rootScores only bounds the moves that did not raise the best score)
+    def scoreMoves(self, moves, depth):
+        self.startIteration(depth)
+        scores = {}
+        for row, col in moves:
+            self.board.make_move(row, col, self.maximizer.symbol)
+            scores[(row, col)] = self.alphabeta(depth - 1, -math.inf, math.inf, False)
+            self.board.undo_move()
+        return scores
+
+    def startIteration(self, depth):
+        self.rootDepth = depth
+        while len(self.killers) <= depth:
+            self.killers.append([None, None])
+
+    def searchRoot(self, depth, rootMoves):
+        if self.workers and self.workers > 1 and len(rootMoves) > 1:
+            return self.searchRootParallel(depth, rootMoves)
+        self.startIteration(depth)
         bestScore = -math.inf
         bestMove = None
+        scores = {}
 
-        for row, col in self.board.get_candidate_moves():
+        for row, col in rootMoves:
             self.board.make_move(row, col, self.maximizer.symbol)
-            score = self.alphabeta(self.maxDepth - 1, -math.inf, math.inf, False)
-            self.board.grid[row][col] = EMPTY_CELL
+            score = self.alphabeta(depth - 1, bestScore, math.inf, False)
+            self.board.undo_move()
+            scores[(row, col)] = score
 
             if score > bestScore:
                 bestScore = score
                 bestMove = (row, col)
 
-        return bestMove
+        return bestMove, bestScore, scores
+
+    # Young brothers wait: the first root move is searched here to set the bound, the rest go to the
+    # pool. Workers read the shared bound when they start a move and raise it when they beat it.
+    def searchRootParallel(self, depth, rootMoves):
+        if self.pool is None:
+            self.rootBound = multiprocessing.Value('d', -math.inf)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_root_worker,
+                                            initargs=(self.rootBound,))
+        self.startIteration(depth)
+        first = rootMoves[0]
+        self.board.make_move(first[0], first[1], self.maximizer.symbol)
+        score = self.alphabeta(depth - 1, -math.inf, math.inf, False)
+        self.board.undo_move()
+        scores = {first: score}
+        self.rootBound.value = score
+
+        moves = self.board.move_list()
+        timeLeft = None if self.deadline is None else self.deadline - time.perf_counter()
+        futures = {self.pool.submit(_search_root_move, (type(self.board), self.board.board_size, moves,
+                                                        self.maximizer, self.minimizer, depth, move, timeLeft)): move
+                   for move in rootMoves[1:]}
+        for future in as_completed(futures):
+            if self.cancelled:
+                for pending in futures:
+                    pending.cancel()
+                raise SearchCancelled
+            score, nodes = future.result()
+            self.nodes += nodes
+            if score is None:
+                for pending in futures:
+                    pending.cancel()
+                raise SearchTimeout
+            scores[futures[future]] = score
+
+        # Moves that failed low scored below the bound, so the first maximum in root order is the serial answer
+        bestScore = -math.inf
+        bestMove = None
+        for move in rootMoves:
+            if scores[move] > bestScore:
+                bestScore = scores[move]
+                bestMove = move
+        return bestMove, bestScore, scores
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # Sorts moves by the threats they make or stop, with the transposition table move and the
+    # killer moves of this ply first; ties keep the board's row-major order
+    def orderMoves(self, moves, symbol, ply, ttMove=None):
+        if not self.moveOrdering:
+            if ttMove is not None and ttMove in moves:
+                moves.remove(ttMove)
+                moves.insert(0, ttMove)
+            return moves
+        size = self.board.board_size
+        codes, table, cellLines = self.board.line_codes, self.board.patterns, self.board.cell_lines
+        offset = 2 * PATTERN_REACH
+        # Each pattern_table entry holds X's pattern in the low nibble and O's in the high one
+        mineShift, theirShift = (0, 4) if symbol == 'X' else (4, 0)
+        history = self.historyTable[symbol]
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        keys = {}
+        for move in moves:
+            index = move[0] * size + move[1]
+            score = history[index]
+            for line, shift in cellLines[index]:
+                entry = table[codes[line] >> (shift - offset) & PATTERN_MASK]
+                score += ATTACK_WEIGHTS[entry >> mineShift & 15] + DEFENCE_WEIGHTS[entry >> theirShift & 15]
+            if move == ttMove:
+                score += TT_MOVE_BONUS
+            elif move in killers:
+                score += KILLER_BONUS
+            keys[move] = -score
+        moves.sort(key=keys.__getitem__)
+        return moves
+
+    def recordCutoff(self, move, symbol, depth):
+        self.stats.cutoffs += 1
+        if not self.moveOrdering:
+            return
+        killers = self.killers[self.rootDepth - depth]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.historyTable[symbol][move[0] * self.board.board_size + move[1]] += depth * depth
+
+    # Follows the best moves stored in the transposition table from the position after `move`
+    def principalVariation(self, move):
+        if move is None:
+            return []
+        pv = [move]
+        self.board.make_move(move[0], move[1], self.maximizer.symbol)
+        isMaximizing = False
+        while self.tt is not None and self.board.winner is None and len(pv) < self.completedDepth:
+            key = self.board.hash ^ _MAXIMIZING_KEY if isMaximizing else self.board.hash
+            entry = self.tt.lookup(key)
+            if entry is None or entry[4] is None or not self.board.is_valid_move(*entry[4]):
+                break
+            symbol = self.maximizer.symbol if isMaximizing else self.minimizer.symbol
+            self.board.make_move(entry[4][0], entry[4][1], symbol)
+            pv.append(entry[4])
+            isMaximizing = not isMaximizing
+        for _ in pv:
+            self.board.undo_move()
+        return pv
+
+    # The values alphabeta(0, ...) returns for the child after each move by `symbol`, from one NumPy batch.
+    # Leaves scored this way are not stored in the transposition table.
+    def leafScores(self, moves, symbol):
+        scores, wins = batch_evaluate(self.board.to_array(), moves, symbol)
+        self.stats.evaluations += len(moves)  # Nodes are counted as the search reads the scores, like visits
+        if self.cancelled:  # The batch may step over the node count the regular check waits for
+            raise SearchCancelled
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        sign = 1 if self.maximizer.symbol == 'X' else -1
+        won = 1 if symbol == self.maximizer.symbol else -1
+        return [won if win else sign * score for score, win in zip(scores.tolist(), wins.tolist())]
 
     def alphabeta(self, depth, alpha, beta, isMaximizing):
-        if self.board.check_winner(self.maximizer.symbol):
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            if self.cancelled:
+                raise SearchCancelled
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout
+        if self.nodeHooks:
+            for hook in self.nodeHooks:
+                hook.on_node(self, depth)
+        if self.board.winner == self.maximizer.symbol:
             return 1
-        elif self.board.check_winner(self.minimizer.symbol):
+        elif self.board.winner == self.minimizer.symbol:
             return -1
-        elif depth == 0 or not self.board.get_empty_cells():
-            return self.board.evaluate(self.maximizer.symbol)
 
+        key = self.board.hash ^ _MAXIMIZING_KEY if isMaximizing else self.board.hash
+        ttMove = None
+        if self.tt is not None:
+            entry = self.tt.lookup(key)
+            if entry is not None:
+                _, entryDepth, flag, entryValue, ttMove = entry
+                if entryDepth >= depth:
+                    if flag == EXACT:
+                        return entryValue
+                    elif flag == LOWER_BOUND:
+                        alpha = max(alpha, entryValue)
+                    else:
+                        beta = min(beta, entryValue)
+                    if beta <= alpha:
+                        return entryValue
+
+        if depth == 0 or self.board.is_full():
+            self.stats.evaluations += 1
+            value = self.board.evaluate(self.maximizer.symbol)
+            if self.tt is not None:  # Leaves are cached too: they are where most transpositions meet
+                self.tt.store(key, depth, EXACT, value, None)
+            return value
+        alphaOrig, betaOrig = alpha, beta
+
+        self.stats.moveGenerations += 1
+        symbol = self.maximizer.symbol if isMaximizing else self.minimizer.symbol
+        moves = self.orderMoves(self.board.get_candidate_moves(), symbol, self.rootDepth - depth, ttMove)
+        # The children of a depth-1 node are leaves: score them all in one batch when the node is likely to
+        # search all of them. With good ordering that is the nodes an even number of plies below the root;
+        # the others usually cut off after a child or two, which is cheaper than a batch.
+        leafScores = None
+        if (depth == 1 and (self.rootDepth - depth) % 2 == 0 and len(moves) >= BATCH_MIN_MOVES
+                and self.batchLeaves()):
+            leafScores = self.leafScores(moves, symbol)
+
+        bestMove = None
         if isMaximizing:
             value = -math.inf
-            for row, col in self.board.get_candidate_moves():
-                self.board.make_move(row, col, self.maximizer.symbol)
-                value = max(value, self.alphabeta(depth - 1, alpha, beta, False))
-                self.board.grid[row][col] = EMPTY_CELL
+            for i, (row, col) in enumerate(moves):
+                if leafScores is None:
+                    self.board.make_move(row, col, self.maximizer.symbol)
+                    score = self.alphabeta(depth - 1, alpha, beta, False)
+                    self.board.undo_move()
+                else:
+                    self.nodes += 1
+                    score = leafScores[i]
+                if score > value:
+                    value, bestMove = score, (row, col)
                 alpha = max(alpha, value)
                 if beta <= alpha:
+                    self.recordCutoff((row, col), symbol, depth)
                     break
-            return value
         else:
             value = math.inf
-            for row, col in self.board.get_candidate_moves():
-                self.board.make_move(row, col, self.minimizer.symbol)
-                value = min(value, self.alphabeta(depth - 1, alpha, beta, True))
-                self.board.grid[row][col] = EMPTY_CELL
+            for i, (row, col) in enumerate(moves):
+                if leafScores is None:
+                    self.board.make_move(row, col, self.minimizer.symbol)
+                    score = self.alphabeta(depth - 1, alpha, beta, True)
+                    self.board.undo_move()
+                else:
+                    self.nodes += 1
+                    score = leafScores[i]
+                if score < value:
+                    value, bestMove = score, (row, col)
                 beta = min(beta, value)
                 if beta <= alpha:
+                    self.recordCutoff((row, col), symbol, depth)
                     break
-            return value
+
+        if self.tt is not None:
+            if value <= alphaOrig:
+                flag = UPPER_BOUND
+            elif value >= betaOrig:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.tt.store(key, depth, flag, value, bestMove)
+        return value
+
+
+class MCTSNode:
+    """One position in the Monte-Carlo tree, reached by `symbol` playing `move`."""
+
+    __slots__ = ("move", "symbol", "parent", "children", "untried", "visits", "wins", "winner")
+
+    def __init__(self, move, symbol, parent, untried, winner=None):
+        self.move = move
+        self.symbol = symbol
+        self.parent = parent
+        self.children = []
+        self.untried = untried  # Candidate moves not expanded yet
+        self.visits = 0
+        self.wins = 0.0  # Playout results from the point of view of `symbol`
+        self.winner = winner  # Set when `move` ended the game
+
+    # Upper confidence bound used to pick the child to descend into
+    def uct(self, logVisits, exploration):
+        return self.wins / self.visits + exploration * math.sqrt(logVisits / self.visits)
+
+    def bestChild(self):
+        return max(self.children, key=lambda child: child.visits)
+
+
+# Playouts stop after this many random moves and score the position with Board.evaluate
+PLAYOUT_DEPTH = 20
+MCTS_ITERATIONS = 1000  # Iterations per move when neither a budget nor a time limit is given
+
+
+class MonteCarlo(SearchEngine):
+    """Monte-Carlo tree search with UCT selection and short random playouts.
+
+    Plays the side to move ('X' moves first), whichever of maximizer and minimizer that is.
+    Playouts only pick cells next to the stones (the candidate frontier, grown by each playout
+    move) and stop after `playoutDepth` moves, scoring the position by the sign of the
+    evaluation. The tree is kept between moves and reused when the game goes down a searched
+    line. With workers > 1 each process grows its own tree and the root visit counts are added up.
+    """
+
+    def __init__(self, board, maximizer, minimizer, iterations=None, timeLimit=None, exploration=1.4,
+                 playoutDepth=PLAYOUT_DEPTH, workers=None, seed=None, book=None, threatSearch=True):
+        super().__init__()
+        self.board = board
+        self.maximizer = maximizer
+        self.minimizer = minimizer
+        self.iterations = iterations  # Playouts per move, None for MCTS_ITERATIONS (or only the time limit)
+        self.timeLimit = timeLimit  # Milliseconds per move
+        self.exploration = exploration
+        self.playoutDepth = playoutDepth
+        self.workers = workers  # Processes growing trees in parallel, None or 1 searches serially
+        self.pool = None
+        self.rng = random.Random(seed)
+        self.book = book
+        self.threats = ThreatSearch(board) if threatSearch else None
+        self.root = None  # Tree of the last search, reused when the game follows it
+        self.rootMoves = []  # Board.move_list() at self.root
+        self.reusedVisits = 0  # Visits the last search inherited from the previous tree
+        self.nodes = 0
+        # Cells within one step of each cell, added to a playout's candidates after a stone lands there
+        size = board.board_size
+        self.neighbours = [[(nr, nc) for nr in range(max(0, r - 1), min(size, r + 2))
+                            for nc in range(max(0, c - 1), min(size, c + 2)) if (nr, nc) != (r, c)]
+                           for r in range(size) for c in range(size)]
+
+    def getBestMove(self, timeLimit=None):
+        timeLimit = self.timeLimit if timeLimit is None else timeLimit
+        if (self.board.stone_count % 2 == 0) != (self.maximizer.symbol == 'X'):
+            self.maximizer, self.minimizer = self.minimizer, self.maximizer
+        self.nodes = 0
+        self.startSearch()
+        bookMove = self.bookMove()
+        if bookMove is not None:
+            return bookMove
+        # The budget covers the book lookup and threat search too
+        deadline = self.searchStart + timeLimit / 1000 if timeLimit is not None else None
+        threatMove = self.threatMove(deadline)
+        if threatMove is not None:
+            return threatMove
+        budget = self.iterations if self.iterations is not None or timeLimit is not None else MCTS_ITERATIONS
+        historyLength = len(self.board.history)
+        try:
+            if self.workers and self.workers > 1:
+                timeLeft = None if deadline is None else max(0.0, deadline - time.perf_counter()) * 1000
+                visits, wins, iterations = self.searchParallel(budget, timeLeft)
+                self.root = None
+            else:
+                iterations = self.search(budget, deadline)
+                visits = {child.move: child.visits for child in self.root.children}
+                wins = {child.move: child.wins for child in self.root.children}
+        except SearchCancelled:
+            self.abortSearch(historyLength)
+            self.root = None
+            raise
+        bestMove = max(visits, key=visits.get) if visits else None
+        score = wins[bestMove] / visits[bestMove] if bestMove is not None else None
+        self.nodes = iterations
+        self.stats.iterations = iterations
+        pv = self.principalVariation(bestMove)
+        self.finishIteration(len(pv), iterations)
+        self.finishSearch(bestMove, score, len(pv), iterations, pv)
+        return bestMove
+
+    # Runs iterations on the (possibly reused) tree until the budget or the deadline; returns how many ran.
+    # self.nodes counts them as they run, so progress displays can read it during the search.
+    def search(self, budget, deadline):
+        self.reuseTree()
+        iterations = 0
+        while budget is None or iterations < budget:
+            if self.cancelled:
+                raise SearchCancelled
+            if deadline is not None and iterations and time.perf_counter() > deadline:
+                break
+            self.iterate()
+            iterations += 1
+            self.nodes += 1
+        return iterations
+
+    # Keeps the subtree of the current position when the moves played since the last search are in the tree
+    def reuseTree(self):
+        moves = self.board.move_list()
+        node = self.root
+        if node is not None and moves[:len(self.rootMoves)] == self.rootMoves:
+            for row, col, symbol in moves[len(self.rootMoves):]:
+                node = next((child for child in node.children if child.move == (row, col)), None)
+                if node is None:
+                    break
+        else:
+            node = None
+        if node is None:
+            last = moves[-1][2] if moves else self.minimizer.symbol
+            candidates = self.board.get_candidate_moves()
+            self.rng.shuffle(candidates)
+            node = MCTSNode(None, last, None, candidates, self.board.winner)
+        node.parent = None
+        self.root, self.rootMoves = node, moves
+        self.reusedVisits = node.visits
+
+    # One iteration: select down the tree by UCT, expand one child, play out from it and back up the result
+    def iterate(self):
+        board = self.board
+        node = self.root
+        played = 0
+        while not node.untried and node.children and node.winner is None:
+            logVisits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.uct(logVisits, self.exploration))
+            board.make_move(node.move[0], node.move[1], node.symbol)
+            played += 1
+        if node.untried and node.winner is None:
+            move = node.untried.pop()
+            symbol = 'O' if node.symbol == 'X' else 'X'
+            board.make_move(move[0], move[1], symbol)
+            played += 1
+            untried = [] if board.winner is not None else board.get_candidate_moves()
+            self.rng.shuffle(untried)
+            child = MCTSNode(move, symbol, node, untried, board.winner)
+            node.children.append(child)
+            node = child
+        if node.winner is not None:
+            result = 1.0 if node.winner == 'X' else 0.0
+        else:
+            result = self.playout('O' if node.symbol == 'X' else 'X')
+        while node is not None:
+            node.visits += 1
+            node.wins += result if node.symbol == 'X' else 1.0 - result
+            node = node.parent
+        for _ in range(played):
+            board.undo_move()
+
+    # Plays random frontier moves from the current position and undoes them; returns 1 if 'X' won,
+    # 0 if 'O' won, and otherwise 1, 0 or 0.5 by the sign of the evaluation where the playout stopped
+    def playout(self, symbol):
+        board = self.board
+        size = board.board_size
+        moves = board.get_candidate_moves()
+        seen = set(moves)
+        rng = self.rng
+        played = 0
+        winner = None
+        while played < self.playoutDepth and moves:
+            i = rng.randrange(len(moves))
+            row, col = moves[i]
+            moves[i] = moves[-1]
+            moves.pop()
+            board.make_move(row, col, symbol)
+            played += 1
+            if board.winner is not None:
+                winner = board.winner
+                break
+            for cell in self.neighbours[row * size + col]:
+                if cell not in seen:
+                    seen.add(cell)
+                    if board.is_valid_move(cell[0], cell[1]):
+                        moves.append(cell)
+            symbol = 'O' if symbol == 'X' else 'X'
+        if winner is None:
+            score = board.evaluate('X')
+            result = 1.0 if score > 0 else 0.0 if score < 0 else 0.5
+        else:
+            result = 1.0 if winner == 'X' else 0.0
+        for _ in range(played):
+            board.undo_move()
+        return result
+
+    # Each worker grows its own tree from the current position; returns the summed root statistics
+    def searchParallel(self, budget, timeLimit):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        share = None if budget is None else max(1, budget // self.workers)
+        moves = self.board.move_list()
+        tasks = [(type(self.board), self.board.board_size, moves, self.maximizer, self.minimizer, share, timeLimit,
+                  self.exploration, self.playoutDepth, self.rng.getrandbits(32)) for _ in range(self.workers)]
+        visits, wins, iterations = {}, {}, 0
+        for rootVisits, rootWins, count in self.pool.map(_search_mcts_tree, tasks):
+            if self.cancelled:
+                raise SearchCancelled
+            iterations += count
+            self.nodes += count
+            for move, value in rootVisits.items():
+                visits[move] = visits.get(move, 0) + value
+                wins[move] = wins.get(move, 0.0) + rootWins[move]
+        return visits, wins, iterations
+
+    # Most visited line from the root, starting with `move`
+    def principalVariation(self, move):
+        pv = [move] if move is not None else []
+        node = self.root
+        if node is not None:
+            node = next((child for child in node.children if child.move == move), None)
+            while node is not None and node.children:
+                node = node.bestChild()
+                pv.append(node.move)
+        return pv
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+# Searches the same position at the same depth with move ordering on and off (transposition table
+# disabled so only the ordering differs) and reports the nodes each needed
+def compare_move_ordering(board, maximizer, minimizer, depth=2):
+    result = {}
+    for label, ordering in (("on", True), ("off", False)):
+        engine = AlphaBeta(board, maximizer, minimizer, maxDepth=depth, ttSize=0, moveOrdering=ordering,
+                           threatSearch=False)
+        start = time.perf_counter()
+        move = engine.getBestMove()
+        result[label] = {"move": move, "score": engine.bestScore, "nodes": engine.nodes,
+                         "seconds": time.perf_counter() - start}
+    result["node_reduction"] = 1 - result["on"]["nodes"] / max(1, result["off"]["nodes"])
+    return result
+
+
+# Shared best root score, set in each worker process by _init_root_worker
+_ROOT_BOUND = None
+
+
+def _init_root_worker(bound):
+    global _ROOT_BOUND
+    _ROOT_BOUND = bound
+
+
+def _replay_board(boardClass, boardSize, moves):
+    board = boardClass(boardSize)
+    for row, col, symbol in moves:
+        board.make_move(row, col, symbol)
+    return board
+
+
+# Worker for AlphaBeta.searchRootParallel: returns (score, nodes), score None when time ran out.
+# Searching with alpha one below the bound keeps ties exact (scores are integers), so a move that
+# equals the best one is still seen and the root keeps the serial tie-break.
+def _search_root_move(task):
+    boardClass, boardSize, moves, maximizer, minimizer, depth, move, timeLeft = task
+    board = _replay_board(boardClass, boardSize, moves)
+    engine = AlphaBeta(board, maximizer, minimizer, maxDepth=depth, ttSize=1 << 16)
+    engine.startIteration(depth)
+    if timeLeft is not None:
+        engine.deadline = time.perf_counter() + timeLeft
+    alpha = _ROOT_BOUND.value - 1
+    board.make_move(move[0], move[1], maximizer.symbol)
+    try:
+        score = engine.alphabeta(depth - 1, alpha, math.inf, False)
+    except SearchTimeout:
+        return None, engine.nodes
+    if score > alpha:
+        with _ROOT_BOUND.get_lock():
+            if score > _ROOT_BOUND.value:
+                _ROOT_BOUND.value = score
+    return score, engine.nodes
+
+
+# Worker for MiniMax.getBestMoveParallel: scores of a chunk of root moves
+def _search_minimax_moves(task):
+    boardClass, boardSize, moves, maximizer, minimizer, depth, chunk = task
+    board = _replay_board(boardClass, boardSize, moves)
+    engine = MiniMax(board, maximizer, minimizer, maxDepth=depth)
+    scores = []
+    for row, col in chunk:
+        board.make_move(row, col, maximizer.symbol)
+        scores.append(engine.minimax(depth - 1, False))
+        board.undo_move()
+    return scores, engine.nodes
+
+
+# Worker for MonteCarlo.searchParallel: root (visits, wins) per move of a tree grown from the position
+def _search_mcts_tree(task):
+    boardClass, boardSize, moves, maximizer, minimizer, budget, timeLimit, exploration, playoutDepth, seed = task
+    board = _replay_board(boardClass, boardSize, moves)
+    engine = MonteCarlo(board, maximizer, minimizer, exploration=exploration, playoutDepth=playoutDepth, seed=seed)
+    deadline = time.perf_counter() + timeLimit / 1000 if timeLimit is not None else None
+    iterations = engine.search(budget, deadline)
+    children = engine.root.children
+    return ({child.move: child.visits for child in children}, {child.move: child.wins for child in children},
+            iterations)
+
+
+# Runs the serial and the parallel root search on the same position and reports the speedup.
+# Each side first runs one untimed search; its worker processes are then handed to a fresh engine,
+# so the timed search neither pays for starting the pool nor reuses a transposition table.
+def compare_parallel_search(board, maximizer, minimizer, depth=2, workers=None, engine="alphabeta"):
+    workers = workers or os.cpu_count() or 1
+
+    def create(count):
+        if engine == "minimax":
+            return MiniMax(board, maximizer, minimizer, maxDepth=depth, workers=count)
+        return AlphaBeta(board, maximizer, minimizer, maxDepth=depth, workers=count, threatSearch=False)
+
+    result = {}
+    for label, count in (("serial", None), ("parallel", workers)):
+        warm = create(count)
+        warm.getBestMove()
+        ai = create(count)
+        ai.pool, warm.pool = warm.pool, None
+        if hasattr(warm, "rootBound"):
+            ai.rootBound = warm.rootBound
+        start = time.perf_counter()
+        move = ai.getBestMove()
+        result[label] = {"move": move, "seconds": time.perf_counter() - start}
+        ai.close()
+    result["workers"] = workers
+    result["same_move"] = result["serial"]["move"] == result["parallel"]["move"]
+    result["speedup"] = result["serial"]["seconds"] / max(1e-9, result["parallel"]["seconds"])
+    return result
 
 
 class Board:
-    def __init__(self, board_size=BOARD_SIZE):
+    def __init__(self, board_size=BOARD_SIZE, candidate_distance=2):
         self.board_size = board_size
         self.grid = [[EMPTY_CELL for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.history = []  # Stack of (row, col, previous winner, previous frontier) used by undo_move
+        self.last_move = None  # Cell of the most recently placed stone
+        self.winner = None  # Symbol of the first player to get five in a row, kept in sync by make/undo
+        self.stone_count = 0
+        self.zobrist = zobrist_keys(board_size)
+        self.hash = 0  # Zobrist hash of the stones on the board, updated incrementally
+        self.windows, self.cell_windows = board_windows(board_size)
+        # Stones of each player in every 5-cell window, and the summed window scores for 'X'
+        self.window_counts = {'X': [0] * len(self.windows), 'O': [0] * len(self.windows)}
+        self.score = 0
+        # Move frontier for get_candidate_moves: a bit mask of the empty cells within candidate_distance
+        # of a stone. Each move ORs in the neighbourhood of the new stone, undo_move restores the saved mask.
+        self.candidate_distance = candidate_distance
+        self.neighbour_masks = board_neighbour_masks(board_size, candidate_distance)
+        self.stone_mask = 0
+        self.frontier = 0
+        self.all_cells = [(r, c) for r in range(board_size) for c in range(board_size)]
+        # Every row, column and diagonal as an integer (see board_lines), for pattern_table lookups
+        initial_codes, self.cell_lines = board_lines(board_size)
+        self.line_codes = list(initial_codes)
+        self.patterns = pattern_table()
 
     def display(self):
         print("\n------------------- Current Board -------------------\n")
@@ -128,10 +1702,131 @@ class Board:
 
     def make_move(self, row, col, symbol):
         if self.is_valid_move(row, col):
-            self.grid[row][col] = symbol
+            index = row * self.board_size + col
+            self._set_cell(row, col, symbol)
+            self.history.append((row, col, self.winner, self.frontier))
+            self.last_move = (row, col)
+            self.stone_count += 1
+            self.hash ^= self.zobrist[symbol][index]
+            self._update_score(index, symbol, 1)
+            self.stone_mask |= 1 << index
+            self.frontier = (self.frontier | self.neighbour_masks[index]) & ~self.stone_mask
+            bits = PATTERN_CELL_BITS[symbol]
+            codes = self.line_codes
+            for line, shift in self.cell_lines[index]:
+                codes[line] |= bits << shift
+            if self.winner is None and self.is_winning_move(row, col):
+                self.winner = symbol
             return True
         return False
 
+    # (row, col, symbol) of every stone in the order it was played
+    def move_list(self):
+        return [(row, col, self.get_cell(row, col)) for row, col, _, _ in self.history]
+
+    # (hash, transform) of the smallest Zobrist hash over the 8 rotations and reflections of the position,
+    # so symmetric positions share one key. `transform` indexes board_symmetries and maps this board's
+    # cells onto the canonical orientation.
+    def canonical_hash(self):
+        symmetries = board_symmetries(self.board_size)
+        hashes = [0] * len(symmetries)
+        for row, col, symbol in self.move_list():
+            keys = self.zobrist[symbol]
+            index = row * self.board_size + col
+            for t, mapping in enumerate(symmetries):
+                hashes[t] ^= keys[mapping[index]]
+        transform = min(range(len(hashes)), key=hashes.__getitem__)
+        return hashes[transform], transform
+
+    # Storage primitives, overridden by other board backends (see BitBoard)
+    def get_cell(self, row, col):
+        return self.grid[row][col]
+
+    def _set_cell(self, row, col, symbol):
+        self.grid[row][col] = symbol
+
+    def undo_move(self):
+        row, col, previous_winner, self.frontier = self.history.pop()
+        index = row * self.board_size + col
+        symbol = self.get_cell(row, col)
+        self.hash ^= self.zobrist[symbol][index]
+        self._update_score(index, symbol, -1)
+        self._set_cell(row, col, EMPTY_CELL)
+        self.stone_mask &= ~(1 << index)
+        codes = self.line_codes
+        for line, shift in self.cell_lines[index]:
+            codes[line] &= ~(3 << shift)
+        self.winner = previous_winner
+        self.last_move = (self.history[-1][0], self.history[-1][1]) if self.history else None
+        self.stone_count -= 1
+        return row, col
+
+    # The board as an int8 NumPy array (1 'X', -1 'O', 0 empty), for batch_evaluate
+    def to_array(self):
+        cells = np.zeros((self.board_size, self.board_size), dtype=np.int8)
+        for row, col, symbol in self.move_list():
+            cells[row, col] = 1 if symbol == 'X' else -1
+        return cells
+
+    # pattern_table entries for an empty cell, one per line through it: the pattern 'X' would make there
+    # is entry & 15, the one 'O' would make is entry >> 4
+    def line_patterns(self, row, col):
+        codes, table = self.line_codes, self.patterns
+        offset = 2 * PATTERN_REACH
+        return [table[codes[line] >> (shift - offset) & PATTERN_MASK]
+                for line, shift in self.cell_lines[row * self.board_size + col]]
+
+    # Rescore only the (at most 20) windows through the changed cell
+    def _update_score(self, index, symbol, step):
+        xs, os = self.window_counts['X'], self.window_counts['O']
+        counts = xs if symbol == 'X' else os
+        delta = 0
+        for w in self.cell_windows[index]:
+            before = WINDOW_SCORES[xs[w]][os[w]]
+            counts[w] += step
+            delta += WINDOW_SCORES[xs[w]][os[w]] - before
+        self.score += delta
+
+    def is_full(self):
+        return self.stone_count == self.board_size * self.board_size
+
+    # Only the four lines through (row, col) can have changed, so walk them instead of scanning the board
+    def is_winning_move(self, row, col):
+        symbol = self.grid[row][col]
+        if symbol == EMPTY_CELL:
+            return False
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            r, c = row + dr, col + dc
+            while 0 <= r < self.board_size and 0 <= c < self.board_size and self.grid[r][c] == symbol:
+                count += 1
+                r, c = r + dr, c + dc
+            r, c = row - dr, col - dc
+            while 0 <= r < self.board_size and 0 <= c < self.board_size and self.grid[r][c] == symbol:
+                count += 1
+                r, c = r - dr, c - dc
+            if count >= 5:
+                return True
+        return False
+
+    # The five (or more) cells of the winning line, or [] while nobody has won
+    def winning_cells(self):
+        if self.winner is None:
+            return []
+        # The winning stone is the first move played after which the winner was set
+        winners_after = [entry[2] for entry in self.history[1:]] + [self.winner]
+        row, col = next((r, c) for (r, c, *_), after in zip(self.history, winners_after) if after is not None)
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            cells = [(row, col)]
+            for step in (1, -1):
+                r, c = row + step * dr, col + step * dc
+                while 0 <= r < self.board_size and 0 <= c < self.board_size and self.get_cell(r, c) == self.winner:
+                    cells.append((r, c))
+                    r, c = r + step * dr, c + step * dc
+            if len(cells) >= 5:
+                return sorted(cells)
+        return []
+
     def check_winner(self, symbol):
         for row in range(self.board_size):
             for col in range(self.board_size):
@@ -154,7 +1849,23 @@ class Board:
     def get_empty_cells(self):
         return [(r, c) for r in range(self.board_size) for c in range(self.board_size) if self.grid[r][c] == EMPTY_CELL]
 
+    # Empty cells near a stone, in row-major order so searches are reproducible
     def get_candidate_moves(self, distance=2):
+        if distance != self.candidate_distance:
+            return self._scan_candidate_moves(distance)
+        if self.frontier:
+            cells = []
+            mask = self.frontier
+            while mask:
+                low = mask & -mask
+                cells.append(divmod(low.bit_length() - 1, self.board_size))
+                mask ^= low
+            return cells
+        # Fallback to full board if no moves are near existing stones (e.g., empty board)
+        return list(self.all_cells) if self.stone_count == 0 else self.get_empty_cells()
+
+    # Full scan used for distances other than the maintained candidate_distance
+    def _scan_candidate_moves(self, distance):
         candidates = set()
 
         for r in range(self.board_size):
@@ -168,7 +1879,7 @@ class Board:
                                     candidates.add((nr, nc))
 
         # Fallback to full board if no moves are near existing stones (e.g., empty board)
-        return list(candidates) if candidates else self.get_empty_cells()
+        return sorted(candidates) if candidates else self.get_empty_cells()
 
     def evaluate_direction(self, r, c, player, opponent, dr, dc):
         max_len = 5
@@ -195,7 +1906,13 @@ class Board:
                 return -200
         return 0
 
+    # Every window scores the same for one player as minus its score for the other,
+    # so the running total kept by make_move/undo_move answers for both perspectives
     def evaluate(self, symbol):
+        return self.score if symbol == 'X' else -self.score
+
+    # Full scan equivalent of evaluate, kept as the reference implementation
+    def evaluate_full(self, symbol):
         opponent = 'O' if symbol == 'X' else 'X'
         score = 0
 
@@ -208,19 +1925,272 @@ class Board:
 
         return score
 
+class BitBoard(Board):
+    """Board backend that keeps each player's stones as one integer bitmask.
+
+    Cell (r, c) is bit r * stride + c with stride = board_size + 1, so every row ends in an
+    always-empty padding bit and shifting a line never wraps into the next row.
+    The four line directions are the shifts 1 (horizontal), stride (vertical),
+    stride + 1 (diagonal ↘) and stride - 1 (diagonal ↙).
+    """
+
+    def __init__(self, board_size=BOARD_SIZE, candidate_distance=2):
+        self.stride = board_size + 1
+        self.shifts = (1, self.stride, self.stride + 1, self.stride - 1)
+        self.valid_mask = 0  # One bit per playable cell, padding bits stay 0
+        for r in range(board_size):
+            self.valid_mask |= ((1 << board_size) - 1) << (r * self.stride)
+        self.bits = {'X': 0, 'O': 0}
+        self.occupied = 0
+        super().__init__(board_size, candidate_distance)
+
+    # The list-of-lists view is rebuilt from the bitmasks; writing into it does not change the board.
+    # Assigning a grid (as Board.__init__ does) only loads the stones, not the history, hash or scores.
+    @property
+    def grid(self):
+        return [[self.get_cell(r, c) for c in range(self.board_size)] for r in range(self.board_size)]
+
+    @grid.setter
+    def grid(self, rows):
+        self.bits = {'X': 0, 'O': 0}
+        self.occupied = 0
+        for r, row in enumerate(rows):
+            for c, symbol in enumerate(row):
+                if symbol != EMPTY_CELL:
+                    self._set_cell(r, c, symbol)
+
+    def get_cell(self, row, col):
+        bit = 1 << (row * self.stride + col)
+        if not self.occupied & bit:
+            return EMPTY_CELL
+        return 'X' if self.bits['X'] & bit else 'O'
+
+    def _set_cell(self, row, col, symbol):
+        bit = 1 << (row * self.stride + col)
+        if symbol == EMPTY_CELL:
+            self.bits['X'] &= ~bit
+            self.bits['O'] &= ~bit
+            self.occupied &= ~bit
+        else:
+            self.bits[symbol] |= bit
+            self.occupied |= bit
+
+    def is_valid_move(self, row, col):
+        return 0 <= row < self.board_size and 0 <= col < self.board_size and \
+            not self.occupied & (1 << (row * self.stride + col))
+
+    def _has_five(self, stones):
+        for d in self.shifts:
+            pairs = stones & (stones >> d)  # Bit i set: stones at i and i+d
+            fours = pairs & (pairs >> (2 * d))  # i .. i+3d
+            if fours & (stones >> (4 * d)):  # i .. i+4d
+                return True
+        return False
+
+    def is_winning_move(self, row, col):
+        symbol = self.get_cell(row, col)
+        return symbol != EMPTY_CELL and self._has_five(self.bits[symbol])
+
+    def check_winner(self, symbol):
+        return self._has_five(self.bits[symbol])
+
+    def _cells(self, mask):
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(divmod(low.bit_length() - 1, self.stride))
+            mask ^= low
+        return cells
+
+    def get_empty_cells(self):
+        return self._cells(self.valid_mask & ~self.occupied)
+
+    def _scan_candidate_moves(self, distance):
+        # Grow the occupied mask one cell at a time, masking after every shift so rows never wrap
+        near = self.occupied
+        for _ in range(distance):
+            near |= ((near << 1) | (near >> 1)) & self.valid_mask
+        for _ in range(distance):
+            near |= ((near << self.stride) | (near >> self.stride)) & self.valid_mask
+        candidates = near & ~self.occupied
+        # Fallback to full board if no moves are near existing stones (e.g., empty board)
+        return self._cells(candidates) if candidates else self.get_empty_cells()
+
+    def evaluate_direction(self, r, c, player, opponent, dr, dc):
+        if not (0 <= r + 4 * dr < self.board_size) or not (0 <= c + 4 * dc < self.board_size):
+            return 0
+        mask = 0
+        for i in range(5):
+            mask |= 1 << ((r + i * dr) * self.stride + c + i * dc)
+        return _window_score((self.bits[player] & mask).bit_count(), (self.bits[opponent] & mask).bit_count())
+
+
 class Player:
     def __init__(self, symbol, is_ai=False, ai_name=None):
         self.symbol = symbol
         self.is_ai = is_ai
-        self.ai_name = ai_name  # minimax or alphabeta
+        self.ai_name = ai_name  # minimax, alphabeta or mcts
+
+
+# True when the engine named `ai_name` honours a time limit; minimax always searches its fixed depth
+def uses_time_limit(ai_name):
+    return "time" in ENGINE_OPTIONS.get(ai_name, ())
+
+
+# Builds the search engine named by Player.ai_name, or None for an unknown name
+# timeLimit (milliseconds per move) applies to the engines that support anytime search (see uses_time_limit),
+# workers > 1 turns on the parallel root search, book is an OpeningBook tried before searching
+def create_engine(ai_name, board, player1, player2, timeLimit=None, workers=None, book=None):
+    if ai_name == "minimax":
+        return MiniMax(board, player1, player2, workers=workers, book=book)
+    elif ai_name == "alphabeta":
+        return AlphaBeta(board, player2, player1, timeLimit=timeLimit, workers=workers, book=book)
+    elif ai_name == "mcts":  # Plays whichever side is to move
+        return MonteCarlo(board, player2, player1, timeLimit=timeLimit, workers=workers, book=book)
+    return None
+
+
+# ---------------------------------<<     Pondering     >> -----------------------------
+
+PONDER_REPLIES = 4  # Opponent moves searched ahead while the opponent thinks
+
+
+# The opponent's `count` most promising moves by their line patterns (own threats plus blocks),
+# starting with `first` (usually the reply from the engine's principal variation) when it is playable
+def likely_replies(board, symbol, count, first=None):
+    size = board.board_size
+    codes, table, cellLines = board.line_codes, board.patterns, board.cell_lines
+    offset = 2 * PATTERN_REACH
+    mineShift, theirShift = (0, 4) if symbol == 'X' else (4, 0)
+    scores = {}
+    for move in board.get_candidate_moves():
+        index = move[0] * size + move[1]
+        score = 0
+        for line, shift in cellLines[index]:
+            entry = table[codes[line] >> (shift - offset) & PATTERN_MASK]
+            score += ATTACK_WEIGHTS[entry >> mineShift & 15] + DEFENCE_WEIGHTS[entry >> theirShift & 15]
+        scores[move] = score
+    replies = sorted(scores, key=lambda move: -scores[move])
+    if first is not None and first in scores:
+        replies.remove(first)
+        replies.insert(0, first)
+    return replies[:count]
+
+
+class Ponderer:
+    """Searches the engine's answers to the opponent's likely moves while the opponent is thinking.
+
+    The searches run on a thread, on a private copy of the board, with a second engine built by
+    `makeEngine(board)` that shares the game engine's transposition table. When the opponent moves,
+    `take` returns the finished answer to that move (a ponder hit), or None (a miss), in which case
+    the game engine still finds the pondered positions in the shared table.
+    """
+
+    def __init__(self, engine, board, makeEngine, replies=PONDER_REPLIES):
+        self.engine = engine
+        self.board = board
+        self.replies = replies
+        self.ponderBoard = type(board)(board.board_size, board.candidate_distance)
+        self.ponderEngine = makeEngine(self.ponderBoard)
+        if getattr(engine, "tt", None) is not None:
+            self.ponderEngine.tt = engine.tt
+        self.results = {}  # Opponent move -> (answer, SearchStats) of a finished ponder search
+        self.thread = None
+        self.stopped = False
+        self.hits = 0
+        self.misses = 0
+        self.savedSeconds = 0.0  # Search time of the hits, which the opponent did not have to wait for
+
+    @property
+    def hitRate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    # Starts pondering the position on the game board, with `opponent` to move; `pv` is the principal
+    # variation of the engine's last move, whose second move is tried first
+    def start(self, opponent, pv=()):
+        self.stop()
+        self.syncBoard()
+        self.results = {}
+        self.stopped = False
+        self.ponderEngine.clearCancel()  # Left over when stop() landed between two ponder searches
+        if self.ponderBoard.winner is not None or self.ponderBoard.is_full():
+            return
+        replies = likely_replies(self.ponderBoard, opponent, self.replies, pv[1] if len(pv) > 1 else None)
+        self.thread = threading.Thread(target=self.run, args=(replies, opponent), daemon=True)
+        self.thread.start()
+
+    # Replays the game board's moves onto the ponder board, undoing only where the two differ
+    def syncBoard(self):
+        target, current = self.board.move_list(), self.ponderBoard.move_list()
+        common = 0
+        while common < min(len(target), len(current)) and target[common] == current[common]:
+            common += 1
+        for _ in range(len(current) - common):
+            self.ponderBoard.undo_move()
+        for row, col, symbol in target[common:]:
+            self.ponderBoard.make_move(row, col, symbol)
+
+    def run(self, replies, opponent):
+        for row, col in replies:
+            if self.stopped:
+                return
+            self.ponderBoard.make_move(row, col, opponent)
+            try:
+                if self.ponderBoard.winner is None and not self.ponderBoard.is_full():
+                    move = self.ponderEngine.getBestMove()
+                    self.results[(row, col)] = (move, self.ponderEngine.stats)
+            except SearchCancelled:
+                return
+            finally:
+                self.ponderBoard.undo_move()
+
+    # Safe to call repeatedly; returns once the ponder thread has put its board back
+    def stop(self):
+        self.stopped = True
+        thread = self.thread
+        if thread is not None and thread.is_alive():
+            self.ponderEngine.cancel()
+            thread.join()
+        self.thread = None
+
+    # Stops pondering and returns (answer, SearchStats) when the opponent's `move` was pondered, else None
+    def take(self, move):
+        self.stop()
+        result = self.results.get(move)
+        self.results = {}
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.savedSeconds += result[1].seconds
+        return result
+
+    def summary(self):
+        return f"ponder hits {self.hits}/{self.hits + self.misses} ({self.hitRate:.0%}), saved {self.savedSeconds:.1f}s"
+
+    def close(self):
+        self.stop()
+        self.ponderEngine.close()
 
 
 class GomokuGame:
-    def __init__(self, player1, player2):
-        self.board = Board()
+    def __init__(self, player1, player2, board_size=BOARD_SIZE, board_class=Board, timeLimit=None, workers=None):
+        self.board = board_class(board_size)
         self.player1 = player1
         self.player2 = player2
         self.current_player = self.player1
+        self.engines = {}  # One engine per AI player, kept for the whole game
+        self.timeLimit = timeLimit  # Milliseconds per AI move, None for fixed-depth search
+        self.workers = workers  # Processes per AI search, None for a serial search
+
+    def get_engine(self, player):
+        if player.symbol not in self.engines:
+            if self.timeLimit is not None and not uses_time_limit(player.ai_name):
+                print(f"{player.ai_name} searches a fixed depth and ignores the time limit.")
+            self.engines[player.symbol] = create_engine(player.ai_name, self.board, self.player1, self.player2,
+                                                        self.timeLimit, self.workers, load_opening_book())
+        return self.engines[player.symbol]
 
     def switch_turn(self):
         self.current_player = self.player2 if self.current_player == self.player1 else self.player1
@@ -232,19 +2202,13 @@ class GomokuGame:
 
             if self.current_player.is_ai:
                 print(f"Current player is AI ({self.current_player.ai_name})")
-                if self.current_player.ai_name == "minimax":
-                    minimax = MiniMax(self.board, self.player1, self.player2)
-                    bestMove = minimax.getBestMove()
+                ai = self.get_engine(self.current_player)
+                if ai is not None:
+                    bestMove = ai.getBestMove()
                     print(f"AI ({self.current_player.symbol}) chooses move: {bestMove}")
+                    print(f"    {ai.stats.summary()}")
                     self.board.make_move(bestMove[0], bestMove[1], self.current_player.symbol)
 
-                elif self.current_player.ai_name == "alphabeta":
-                    alphabeta = AlphaBeta(self.board, self.player2, self.player1)
-                    bestMove = alphabeta.getBestMove()
-                    print(f"AI ({self.current_player.symbol}) chooses move: {bestMove}")
-                    self.board.make_move(bestMove[0], bestMove[1], self.current_player.symbol)
-                    pass
-
             else:
                 try:
                     row_col = input("Enter your move (row col) or 'exit': ").strip()
@@ -260,7 +2224,7 @@ class GomokuGame:
                     print("Invalid move. Try again.")
                     continue
 
-            if self.board.check_winner(self.current_player.symbol):
+            if self.board.winner == self.current_player.symbol:
                 self.board.display()
                 print(f"🏆 Player {self.current_player.symbol} wins!")
                 break
@@ -268,6 +2232,749 @@ class GomokuGame:
             self.switch_turn()
 
 
+# ---------------------------------<<       Arena       >> -----------------------------
+
+# Options each algorithm understands; EngineConfig.parse rejects the others instead of ignoring them
+ENGINE_OPTIONS = {"minimax": ("depth",), "alphabeta": ("depth", "time", "threats"),
+                  "mcts": ("time", "threats", "iterations")}
+
+
+class EngineConfig:
+    """One side of an arena match: algorithm name plus optional depth, playouts (mcts), time budget (ms)
+    and threat search."""
+
+    def __init__(self, algorithm="alphabeta", depth=None, timeLimit=None, threats=True, iterations=None):
+        self.algorithm = algorithm
+        self.depth = depth
+        self.timeLimit = timeLimit
+        self.threats = threats  # Run the threat search before the main search
+        self.iterations = iterations  # Playouts per move for mcts
+
+    # "alphabeta", "alphabeta:depth=3", "alphabeta:time=200", "alphabeta:depth=2:threats=0"
+    # or "mcts:iterations=2000". depth and time exclude each other: with a time limit alphabeta
+    # deepens until the time runs out
+    @classmethod
+    def parse(cls, text):
+        name, *options = text.split(":")
+        config = cls(name)
+        for option in options:
+            key, _, value = option.partition("=")
+            if key == "depth":
+                config.depth = int(value)
+            elif key == "time":
+                config.timeLimit = int(value)
+            elif key == "threats":
+                config.threats = bool(int(value))
+            elif key == "iterations":
+                config.iterations = int(value)
+            else:
+                raise ValueError(f"Unknown engine option '{key}' in '{text}'")
+        if config.depth is not None and config.timeLimit is not None:
+            raise ValueError(f"'{text}' sets both depth and time; use one of them")
+        given = (("depth", config.depth is not None), ("time", config.timeLimit is not None),
+                 ("threats", not config.threats), ("iterations", config.iterations is not None))
+        for option, isSet in given:
+            if isSet and option not in ENGINE_OPTIONS.get(name, (option,)):
+                raise ValueError(f"{name} does not use the '{option}' option in '{text}'")
+        return config
+
+    def create(self, board, player, opponent):
+        if self.algorithm == "minimax":
+            return MiniMax(board, player, opponent, maxDepth=self.depth or 1)
+        elif self.algorithm == "alphabeta":
+            return AlphaBeta(board, player, opponent, maxDepth=self.depth or 2, timeLimit=self.timeLimit,
+                             threatSearch=self.threats)
+        elif self.algorithm == "mcts":
+            return MonteCarlo(board, player, opponent, iterations=self.iterations, timeLimit=self.timeLimit,
+                              threatSearch=self.threats)
+        raise ValueError(f"Unknown algorithm '{self.algorithm}'")
+
+    def __str__(self):
+        text = self.algorithm
+        if self.depth is not None:
+            text += f":depth={self.depth}"
+        if self.iterations is not None:
+            text += f":iterations={self.iterations}"
+        if self.timeLimit is not None:
+            text += f":time={self.timeLimit}"
+        if not self.threats:
+            text += ":threats=0"
+        return text
+
+
+# Plays one engine-vs-engine game without any output. The first `openingMoves` stones are random
+# cells near the centre (seeded per game) so repeated pairings do not replay the same game.
+def play_arena_game(task):
+    gameIndex, configA, configB, boardSize, aPlaysX, openingMoves, seed = task
+    board = Board(boardSize)
+    playerX, playerO = Player('X', is_ai=True), Player('O', is_ai=True)
+    configs = {'X': configA if aPlaysX else configB, 'O': configB if aPlaysX else configA}
+    engines = {'X': configs['X'].create(board, playerX, playerO), 'O': configs['O'].create(board, playerO, playerX)}
+    stats = {symbol: {"moves": 0, "seconds": 0.0, "nodes": 0} for symbol in ('X', 'O')}
+
+    rng = random.Random(seed * 1000003 + gameIndex)
+    symbol = 'X'
+    centre = boardSize // 2
+    for _ in range(openingMoves):
+        while True:
+            row, col = centre + rng.randint(-2, 2), centre + rng.randint(-2, 2)
+            if board.make_move(row, col, symbol):
+                break
+        symbol = 'O' if symbol == 'X' else 'X'
+
+    while board.winner is None and not board.is_full():
+        start = time.perf_counter()
+        move = engines[symbol].getBestMove()
+        stats[symbol]["seconds"] += time.perf_counter() - start
+        stats[symbol]["moves"] += 1
+        stats[symbol]["nodes"] += engines[symbol].nodes
+        board.make_move(move[0], move[1], symbol)
+        if board.winner is None:
+            symbol = 'O' if symbol == 'X' else 'X'
+
+    sideA, sideB = ('X', 'O') if aPlaysX else ('O', 'X')
+    winner = None if board.winner is None else ("A" if board.winner == sideA else "B")
+    return {"game": gameIndex, "a_plays": sideA, "winner": winner, "moves": board.stone_count,
+            "A": stats[sideA], "B": stats[sideB]}
+
+
+# Yields the result of each game as soon as it finishes; engine A plays X in the even games
+def run_arena(configA, configB, games, boardSize=BOARD_SIZE, workers=None, openingMoves=2, seed=0):
+    tasks = [(i, configA, configB, boardSize, i % 2 == 0, openingMoves, seed) for i in range(games)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for future in as_completed([pool.submit(play_arena_game, task) for task in tasks]):
+            yield future.result()
+
+
+def summarize_arena(results, seconds):
+    summary = {"games": len(results), "wins": 0, "draws": 0, "losses": 0,
+               "games_per_second": len(results) / max(seconds, 1e-9)}
+    for result in results:
+        if result["winner"] == "A":
+            summary["wins"] += 1
+        elif result["winner"] == "B":
+            summary["losses"] += 1
+        else:
+            summary["draws"] += 1
+    for side in ("A", "B"):
+        moves = sum(result[side]["moves"] for result in results)
+        searchSeconds = sum(result[side]["seconds"] for result in results)
+        nodes = sum(result[side]["nodes"] for result in results)
+        summary[side] = {"ms_per_move": 1000 * searchSeconds / max(moves, 1),
+                         "nodes_per_second": nodes / max(searchSeconds, 1e-9)}
+    return summary
+
+
+def arena_main(args):
+    configA, configB = EngineConfig.parse(args.engine_a), EngineConfig.parse(args.engine_b)
+    print(f"Arena: A = {configA}, B = {configB}, {args.games} games on {args.size}x{args.size}")
+    results = []
+    start = time.perf_counter()
+    for result in run_arena(configA, configB, args.games, args.size, args.workers, args.opening_moves, args.seed):
+        results.append(result)
+        outcome = {"A": "A wins", "B": "B wins", None: "draw"}[result["winner"]]
+        print(f"game {result['game']:4}  A as {result['a_plays']}  {outcome:7}  {result['moves']} moves", flush=True)
+    summary = summarize_arena(results, time.perf_counter() - start)
+    print(f"A: {summary['wins']} wins / {summary['draws']} draws / {summary['losses']} losses  "
+          f"({summary['games_per_second']:.2f} games/s)")
+    for side, config in (("A", configA), ("B", configB)):
+        print(f"{side} ({config}): {summary[side]['ms_per_move']:.1f} ms/move, "
+              f"{summary[side]['nodes_per_second']:.0f} nodes/s")
+
+
+# ---------------------------------<<    Benchmarks     >> -----------------------------
+
+BENCHMARK_POSITIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_positions.json")
+
+
+# Builds a board from rows of EMPTY_CELL / 'X' / 'O' characters (stones are placed in row-major order)
+def load_position(rows, board_class=Board):
+    board = board_class(len(rows))
+    for r, row in enumerate(rows):
+        for c, symbol in enumerate(row):
+            if symbol != EMPTY_CELL:
+                board.make_move(r, c, symbol)
+    return board
+
+
+BENCH_ROUNDS = 3  # Timed rounds per measurement; the best one is kept, since noise only ever slows a run down
+
+
+# Calls fn in growing batches until at least minSeconds / BENCH_ROUNDS have passed, BENCH_ROUNDS times
+# after one warm-up call, and returns the calls per second of the fastest round
+def measure_ops(fn, minSeconds):
+    fn()
+    best = 0.0
+    for _ in range(BENCH_ROUNDS):
+        calls = 0
+        batch = 1
+        start = time.perf_counter()
+        while True:
+            for _ in range(batch):
+                fn()
+            calls += batch
+            elapsed = time.perf_counter() - start
+            if elapsed >= minSeconds / BENCH_ROUNDS:
+                best = max(best, calls / elapsed)
+                break
+            batch *= 2
+    return best
+
+
+def _make_undo(board, move, symbol):
+    board.make_move(move[0], move[1], symbol)
+    board.undo_move()
+
+
+def benchmark_primitives(position, board_class, minSeconds):
+    board = load_position(position["rows"], board_class)
+    symbol = position["to_move"]
+    move = board.get_candidate_moves()[0]
+    primitives = {
+        "check_winner": lambda: board.check_winner(symbol),
+        "evaluate": lambda: board.evaluate(symbol),
+        "evaluate_full": lambda: board.evaluate_full(symbol),
+        "get_candidate_moves": board.get_candidate_moves,
+        "make_undo": lambda: _make_undo(board, move, symbol),
+    }
+    return {name: measure_ops(fn, minSeconds) for name, fn in primitives.items()}
+
+
+# Times the search of a fresh engine (so no transposition table or history carries over) after one
+# untimed warm-up search, BENCH_ROUNDS times, and reports the fastest
+def benchmark_engine(position, algorithm, depth):
+    player = Player(position["to_move"])
+    opponent = Player('O' if player.symbol == 'X' else 'X')
+    seconds = math.inf
+    for attempt in range(BENCH_ROUNDS + 1):
+        board = load_position(position["rows"], Board)
+        # Without the threat search, so tactical positions still time the main search
+        engine = EngineConfig(algorithm, depth, threats=False).create(board, player, opponent)
+        start = time.perf_counter()
+        move = engine.getBestMove()
+        if attempt:  # The first search warms up caches and lazily built tables
+            seconds = min(seconds, time.perf_counter() - start)
+        engine.close()
+    return {"move": list(move), "seconds": seconds, "nodes": engine.nodes,
+            "nodes_per_second": engine.nodes / max(seconds, 1e-9)}
+
+
+# Runs every position of the corpus; results are keyed "<position>/<backend>/<primitive>" and
+# "<position>/<engine>:depth=<n>"
+# With `ordering`, also "ordering" -> "<position>/alphabeta:depth=<n>": nodes with move ordering on and off;
+# with `parallel` workers, also "parallel" -> "<position>/alphabeta:depth=<n>": serial vs parallel root search
+def run_benchmarks(positions, quick=False, ordering=False, parallel=None):
+    minSeconds = 0.05 if quick else 0.25
+    engines = [("minimax", 1), ("alphabeta", 2)] + ([] if quick else [("alphabeta", 3)])
+    results = {"python": sys.version.split()[0], "primitives": {}, "engines": {}}
+    if ordering:
+        results["ordering"] = {}
+    if parallel:
+        results["parallel"] = {}
+    for position in positions:
+        for board_class in (Board, BitBoard):
+            for name, ops in benchmark_primitives(position, board_class, minSeconds).items():
+                results["primitives"][f"{position['name']}/{board_class.__name__}/{name}"] = ops
+        for algorithm, depth in engines:
+            results["engines"][f"{position['name']}/{algorithm}:depth={depth}"] = \
+                benchmark_engine(position, algorithm, depth)
+        depth = 2 if quick else 3
+        board = load_position(position["rows"], Board)
+        player = Player(position["to_move"])
+        opponent = Player('O' if player.symbol == 'X' else 'X')
+        if ordering:
+            results["ordering"][f"{position['name']}/alphabeta:depth={depth}"] = \
+                compare_move_ordering(board, player, opponent, depth)
+        if parallel:
+            results["parallel"][f"{position['name']}/alphabeta:depth={depth}"] = \
+                compare_parallel_search(board, player, opponent, depth, parallel)
+    return results
+
+
+# Lists every metric that got worse than the baseline by more than `threshold` (0.1 = 10%)
+def compare_benchmarks(current, baseline, threshold=0.1):
+    regressions = []
+    for key, ops in current["primitives"].items():
+        before = baseline.get("primitives", {}).get(key)
+        if before and ops < before * (1 - threshold):
+            regressions.append((key, "ops_per_second", before, ops))
+    for key, result in current["engines"].items():
+        before = baseline.get("engines", {}).get(key)
+        if not before:
+            continue
+        if result["seconds"] > before["seconds"] * (1 + threshold):
+            regressions.append((key, "seconds", before["seconds"], result["seconds"]))
+        if result["nodes_per_second"] < before["nodes_per_second"] * (1 - threshold):
+            regressions.append((key, "nodes_per_second", before["nodes_per_second"], result["nodes_per_second"]))
+    return regressions
+
+
+def bench_main(args):
+    with open(args.positions) as file:
+        positions = [position for position in json.load(file) if args.filter in position["name"]]
+    results = run_benchmarks(positions, args.quick, args.ordering, args.parallel)
+    for key, ops in results["primitives"].items():
+        print(f"{key:55} {ops:14,.0f} ops/s")
+    for key, result in results["engines"].items():
+        print(f"{key:55} {result['seconds'] * 1000:10.1f} ms {result['nodes_per_second']:12,.0f} nodes/s")
+    for key, result in results.get("ordering", {}).items():
+        print(f"{key:55} ordering on {result['on']['nodes']:9,} nodes, off {result['off']['nodes']:9,} "
+              f"({result['node_reduction']:.0%} fewer)")
+    for key, result in results.get("parallel", {}).items():
+        print(f"{key:55} {result['workers']} workers: {result['speedup']:.2f}x"
+              f"{'' if result['same_move'] else ' DIFFERENT MOVE'}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=1)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_benchmarks(results, json.load(file), args.threshold)
+        for key, metric, before, after in regressions:
+            print(f"SLOWER {key} {metric}: {before:,.4g} -> {after:,.4g}")
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+
+# ---------------------------------<<   Opening book    >> -----------------------------
+
+# Fills an opening book for one board size by searching every position up to `plies` stones deep
+# offline. The engine's move and the first 2 * `branching` moves of its move ordering are scored
+# with full-window searches, and the `branching` best of them are played and expanded, so the book
+# covers the strongest replies of both sides. Positions are keyed by canonical hash, so a line and
+# its mirror images are only searched once.
+def build_opening_book(path, boardSize=BOARD_SIZE, plies=4, branching=3, depth=3, timeLimit=None, progress=None):
+    board = Board(boardSize)
+    players = {'X': Player('X', is_ai=True, ai_name="alphabeta"), 'O': Player('O', is_ai=True, ai_name="alphabeta")}
+    engines = {'X': AlphaBeta(board, players['X'], players['O'], maxDepth=depth, timeLimit=timeLimit),
+               'O': AlphaBeta(board, players['O'], players['X'], maxDepth=depth, timeLimit=timeLimit)}
+    symmetries = board_symmetries(boardSize)
+    entries = {}
+
+    def expand(ply):
+        key, transform = board.canonical_hash()
+        if key in entries or board.winner is not None:
+            return
+        symbol = 'X' if ply % 2 == 0 else 'O'
+        engine = engines[symbol]
+        move = engine.getBestMove()
+        stats = engine.stats
+        # The root search's other scores are fail-low bounds, so the candidates are searched again in full
+        candidates = engine.orderMoves(board.get_candidate_moves(), symbol, 0)[:2 * branching]
+        if move not in candidates:
+            candidates.append(move)
+        scores = engine.scoreMoves(candidates, depth if timeLimit is None else max(engine.completedDepth, 1))
+        entries[key] = (symmetries[transform][move[0] * boardSize + move[1]], int(scores[move]))
+        if progress is not None:
+            progress(len(entries), ply, move, stats)
+        if ply + 1 < plies:
+            replies = sorted(scores, key=lambda cell: (cell != move, -scores[cell]))
+            for row, col in replies[:branching]:
+                board.make_move(row, col, symbol)
+                expand(ply + 1)
+                board.undo_move()
+
+    expand(0)
+    OpeningBook.write(path, boardSize, entries)
+    return len(entries)
+
+
+def book_main(args):
+    def progress(count, ply, move, stats):
+        print(f"{count:5} ply {ply} -> {move[0]},{move[1]} | {stats.summary()}")
+
+    start = time.perf_counter()
+    count = build_opening_book(args.output, args.size, args.plies, args.branching, args.depth, args.time, progress)
+    print(f"{count} positions written to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+# ---------------------------------<<   Engine server   >> -----------------------------
+#
+# Line protocol, one game per connection (coordinates are "row,col"; "row col" is accepted too):
+#   START size           -> OK                  new game on a size x size board
+#   INFO key value       -> (no reply)          timeout_turn <ms>, engine <spec, e.g. alphabeta:depth=3 or mcts>
+#   BEGIN                -> row,col             the engine moves first
+#   TURN row,col         -> row,col             the opponent's move, answered with the engine's
+#   BOARD / row,col,who / DONE -> row,col       a whole position (who: 1 engine, 2 opponent), engine to move
+#   RESTART              -> OK                  same size, empty board
+#   STATS                -> MESSAGE ...         server latency percentiles and throughput
+#   ABOUT                -> name="...", ...
+#   END                                         closes the game
+# Errors are answered with "ERROR <reason>"; "ERROR busy" means no search slot freed up within the time budget.
+# After "ERROR busy" or "ERROR timeout" the game is as it was before the request, so it can be sent again.
+# timeout_turn limits each search unless the engine spec sets a depth, which is then searched in full.
+
+DEFAULT_SERVER_PORT = 7777
+SERVER_ENGINES = ("minimax", "alphabeta", "mcts")
+SERVER_RETRY_ERRORS = ("ERROR busy", "ERROR timeout")  # Requests that left the game unchanged
+SERVER_ABOUT = 'name="GomokuGameAI", version="1.0", author="Gen Ahmed team"'
+
+# Per worker process: game id -> (engine spec, engine symbol, EngineConfig, board, engine), kept between turns
+# so transposition tables and search trees carry over
+_SERVER_GAMES = {}
+
+
+# Worker for EngineServer: the engine's move (or None once the game is over) in game `gameId` after
+# `moves`. The board is only rebuilt when `moves` does not extend the position the worker already has.
+def _server_search(task):
+    gameId, spec, size, moves, symbol, timeLimit = task
+    game = _SERVER_GAMES.get(gameId)
+    if game is not None:
+        gameSpec, gameSymbol, config, board, engine = game
+        known = board.move_list()
+        if gameSpec != spec or gameSymbol != symbol or board.board_size != size or moves[:len(known)] != known:
+            game = None
+    if game is None:
+        board = Board(size)
+        config = EngineConfig.parse(spec)
+        player, opponent = Player(symbol, is_ai=True), Player('O' if symbol == 'X' else 'X', is_ai=True)
+        engine = config.create(board, player, opponent)
+        _SERVER_GAMES[gameId] = (spec, symbol, config, board, engine)
+        known = []
+    for row, col, stone in moves[len(known):]:
+        board.make_move(row, col, stone)
+    if board.winner is not None or board.is_full():
+        return None, 0
+    if hasattr(engine, "timeLimit") and config.depth is None:
+        # The request budget caps whatever time the engine spec asks for; a spec with a depth searches
+        # exactly that deep instead, since a time limit would make alphabeta deepen past it
+        limits = [limit for limit in (config.timeLimit, timeLimit) if limit is not None]
+        engine.timeLimit = min(limits) if limits else None
+    move = engine.getBestMove()
+    return move, engine.nodes
+
+
+def _server_forget(gameId):
+    _SERVER_GAMES.pop(gameId, None)
+
+
+# "7,7" or "7 7" -> (7, 7), None when malformed
+def _parse_cell(text):
+    parts = text.replace(",", " ").split()
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        return None
+    return int(parts[0]), int(parts[1])
+
+
+class EngineServer:
+    """Serves many games at once over TCP (or one over stdin/stdout) with the line protocol above.
+
+    Searches run in `workers` single-process executors; each game stays on one of them so its
+    engine state survives between turns. At most `queueSize` searches are queued or running: a
+    request waits for a slot (which stops reading its connection) and gets "ERROR busy" if none
+    frees up within its time budget.
+    """
+
+    def __init__(self, workers=None, queueSize=None, engine="alphabeta:time=1000", timeLimit=1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.queueSize = queueSize or 4 * self.workers
+        self.engine = engine  # Default engine spec, INFO engine overrides it per game
+        self.timeLimit = timeLimit  # Default milliseconds per move, INFO timeout_turn overrides it
+        self.executors = []
+        self.slots = None
+        self.nextGame = 0
+        self.latencies = deque(maxlen=10000)  # Seconds per answered search request
+        self.requests = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+
+    async def start(self):
+        self.executors = [ProcessPoolExecutor(max_workers=1) for _ in range(self.workers)]
+        self.slots = asyncio.Semaphore(self.queueSize)
+        self.started = time.perf_counter()
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown(cancel_futures=True)
+        self.executors = []
+
+    async def serveTcp(self, host="127.0.0.1", port=0):
+        await self.start()
+        return await asyncio.start_server(self.handleConnection, host, port)
+
+    async def handleConnection(self, reader, writer):
+        async def send(line):
+            writer.write((line + "\n").encode())
+            await writer.drain()
+
+        try:
+            await self.runSession(reader.readline, send)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # Serves one game on stdin/stdout
+    async def serveStdio(self):
+        await self.start()
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        async def send(line):
+            print(line, flush=True)
+
+        await self.runSession(reader.readline, send)
+
+    # Reads commands until END or end of input; `readline` returns bytes, `send` writes one reply line
+    async def runSession(self, readline, send):
+        gameId = self.nextGame
+        self.nextGame += 1
+        executor = self.executors[gameId % len(self.executors)]
+        game = {"size": None, "moves": [], "engine": self.engine, "timeLimit": self.timeLimit}
+        try:
+            while True:
+                raw = await readline()
+                if not raw:
+                    break
+                line = raw.decode().strip()
+                if not line:
+                    continue
+                command, _, rest = line.partition(" ")
+                command = command.upper()
+                if command == "END":
+                    break
+                elif command == "BOARD":
+                    rows = []
+                    while True:
+                        entry = (await readline()).decode().strip()
+                        if not entry or entry.upper() == "DONE":
+                            break
+                        rows.append(entry)
+                    reply = await self.handleBoard(gameId, executor, game, rows)
+                else:
+                    reply = await self.handleCommand(gameId, executor, game, command, rest)
+                if reply is not None:
+                    await send(reply)
+        finally:
+            try:
+                executor.submit(_server_forget, gameId)
+            except RuntimeError:  # Executor already shut down with the server
+                pass
+
+    async def handleCommand(self, gameId, executor, game, command, rest):
+        if command == "START":
+            try:
+                size = int(rest)
+            except ValueError:
+                return "ERROR START needs a board size"
+            if not 5 <= size <= 20:
+                return "ERROR unsupported size"
+            game.update(size=size, moves=[])
+            return "OK"
+        elif command == "RESTART":
+            game.update(moves=[])
+            return "OK" if game["size"] else "ERROR no game started"
+        elif command == "INFO":
+            key, _, value = rest.partition(" ")
+            if key == "timeout_turn" and value.strip().isdigit():
+                game["timeLimit"] = int(value) or None
+            elif key == "engine":
+                try:
+                    config = EngineConfig.parse(value.strip())
+                except ValueError as error:
+                    return f"ERROR {error}"
+                if config.algorithm not in SERVER_ENGINES:
+                    return f"ERROR unknown engine {config.algorithm}"
+                game["engine"] = value.strip()
+            return None
+        elif command == "ABOUT":
+            return SERVER_ABOUT
+        elif command == "STATS":
+            stats = self.stats()
+            return ("MESSAGE " + " ".join(f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                                          for key, value in stats.items()))
+        elif command in ("BEGIN", "TURN"):
+            if not game["size"]:
+                return "ERROR no game started"
+            if command == "TURN":
+                move = _parse_cell(rest)
+                if move is None:
+                    return "ERROR TURN needs row,col"
+                symbol = 'X' if len(game["moves"]) % 2 == 0 else 'O'
+                if not self.playable(game, move):
+                    return "ERROR invalid move"
+                game["moves"].append((move[0], move[1], symbol))
+            reply = await self.search(gameId, executor, game)
+            if command == "TURN" and reply in SERVER_RETRY_ERRORS:
+                game["moves"].pop()  # Unanswered, so the client can send the same TURN again
+            return reply
+        return f"ERROR unknown command {command}"
+
+    async def handleBoard(self, gameId, executor, game, rows):
+        if not game["size"]:
+            return "ERROR no game started"
+        stones = []
+        for row in rows:
+            parts = row.replace(",", " ").split()
+            if len(parts) != 3 or not all(part.isdigit() for part in parts) or parts[2] not in ("1", "2"):
+                return "ERROR BOARD lines are row,col,who"
+            stones.append((int(parts[0]), int(parts[1]), parts[2]))
+        own = sum(who == "1" for _, _, who in stones)
+        # The engine is to move, so it has X when both sides have as many stones and O when it is one behind
+        if own not in (len(stones) - own, len(stones) - own - 1):
+            return "ERROR BOARD stone counts do not fit the engine to move"
+        symbol = 'X' if own == len(stones) - own else 'O'
+        other = 'O' if symbol == 'X' else 'X'
+        game.update(moves=[])
+        for row, col, who in stones:
+            if not self.playable(game, (row, col)):
+                return "ERROR invalid move"
+            game["moves"].append((row, col, symbol if who == "1" else other))
+        return await self.search(gameId, executor, game)
+
+    @staticmethod
+    def playable(game, move):
+        row, col = move
+        return (0 <= row < game["size"] and 0 <= col < game["size"]
+                and all((r, c) != move for r, c, _ in game["moves"]))
+
+    # Runs the engine's search for the side to move and records its move
+    async def search(self, gameId, executor, game):
+        started = time.perf_counter()
+        budget = game["timeLimit"] / 1000 if game["timeLimit"] else None
+        try:
+            await asyncio.wait_for(self.slots.acquire(), budget)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return "ERROR busy"
+        symbol = 'X' if len(game["moves"]) % 2 == 0 else 'O'
+        task = (gameId, game["engine"], game["size"], list(game["moves"]), symbol, game["timeLimit"])
+        future = asyncio.get_running_loop().run_in_executor(executor, _server_search, task)
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            # The engine keeps to its own time limit; the margin covers process hand-off and depth 1
+            move, _ = await asyncio.wait_for(asyncio.shield(future), None if budget is None else 2 * budget + 1)
+        except asyncio.TimeoutError:
+            return "ERROR timeout"
+        if move is None:
+            return "ERROR game over"
+        game["moves"].append((move[0], move[1], symbol))
+        self.requests += 1
+        self.latencies.append(time.perf_counter() - started)
+        return f"{move[0]},{move[1]}"
+
+    # Latency percentiles (ms) over the last answered requests, and throughput since start
+    def stats(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        elapsed = time.perf_counter() - self.started
+        return {"requests": self.requests, "rejected": self.rejected, "p50_ms": percentile(0.5),
+                "p90_ms": percentile(0.9), "p99_ms": percentile(0.99),
+                "throughput": self.requests / elapsed if elapsed else 0.0}
+
+
+class EngineClient:
+    """Minimal asyncio client for EngineServer, used by the load test and for poking a server by hand."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=DEFAULT_SERVER_PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def send(self, *lines):
+        self.writer.write("".join(line + "\n" for line in lines).encode())
+        await self.writer.drain()
+
+    # Sends a command and returns the reply line
+    async def request(self, *lines):
+        await self.send(*lines)
+        return (await self.reader.readline()).decode().strip()
+
+    async def close(self):
+        await self.send("END")
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+# One client game against the server: the client answers with random cells next to the stones
+# (or the centre) until someone wins, the board fills up or `maxMoves` client moves were played.
+# Returns the number of engine replies and the error replies seen.
+async def _load_test_game(port, size, timeLimit, maxMoves, engine, rng):
+    client = await EngineClient.connect(port=port)
+    board = Board(size)
+    replies, errors = 0, []
+    try:
+        await client.request(f"START {size}")
+        await client.send(f"INFO timeout_turn {timeLimit}")
+        if engine:
+            await client.send(f"INFO engine {engine}")
+        for _ in range(maxMoves):
+            moves = sorted(board.get_candidate_moves()) or [(size // 2, size // 2)]
+            row, col = rng.choice(moves)
+            board.make_move(row, col, 'X')
+            if board.winner is not None or board.is_full():
+                break
+            reply = await client.request(f"TURN {row},{col}")
+            move = _parse_cell(reply)
+            if move is None:
+                errors.append(reply)
+                break
+            replies += 1
+            board.make_move(move[0], move[1], 'O')
+            if board.winner is not None or board.is_full():
+                break
+    finally:
+        await client.close()
+    return replies, errors
+
+
+# Starts a server on a free local port and plays `games` concurrent client games against it
+async def run_load_test(games=8, size=BOARD_SIZE, timeLimit=200, maxMoves=10, workers=None, queueSize=None,
+                        engine=None, seed=0):
+    server = EngineServer(workers=workers, queueSize=queueSize, timeLimit=timeLimit)
+    tcp = await server.serveTcp(port=0)
+    port = tcp.sockets[0].getsockname()[1]
+    try:
+        rng = random.Random(seed)
+        results = await asyncio.gather(*(_load_test_game(port, size, timeLimit, maxMoves, engine,
+                                                         random.Random(rng.random())) for _ in range(games)))
+        stats = server.stats()
+    finally:
+        tcp.close()
+        await tcp.wait_closed()
+        server.close()
+    stats["errors"] = [error for _, errors in results for error in errors]
+    return stats
+
+
+def serve_main(args):
+    server = EngineServer(args.workers, args.queue, args.engine, args.time or None)
+
+    async def serve():
+        if args.stdio:
+            await server.serveStdio()
+            return
+        tcp = await server.serveTcp(args.host, args.port)
+        print(f"Serving on {', '.join(str(sock.getsockname()) for sock in tcp.sockets)}", flush=True)
+        async with tcp:
+            await tcp.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def load_test_main(args):
+    stats = asyncio.run(run_load_test(args.games, args.size, args.time, args.moves, args.workers, args.queue,
+                                      args.engine, args.seed))
+    print(f"{stats['requests']} requests, {stats['rejected']} rejected, {len(stats['errors'])} errors")
+    print(f"latency p50 {stats['p50_ms']:.1f} ms, p90 {stats['p90_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+    print(f"throughput {stats['throughput']:.1f} requests/s")
+    for error in sorted(set(stats["errors"])):
+        print(f"  {error}")
+
+
 # Test Without GUI
 # if __name__ == "__main__":
 #     while True:
@@ -353,7 +3060,7 @@ class Menu:
         self.board_size_window.title("Enter Board Size")
 
         window_width = 400
-        window_height = 250
+        window_height = 480
         screen_width = self.root.winfo_screenwidth()
         x_coordinate = (screen_width - window_width) // 2
 
@@ -379,6 +3086,25 @@ class Menu:
             tk.Radiobutton(self.board_size_window, text="Alpha-Beta", variable=self.ai_choice, value="alphabeta",
                            font=("Segoe UI", 12), bg="#1E88E5", fg="white", selectcolor="#1565C0").pack()
 
+            tk.Radiobutton(self.board_size_window, text="Monte-Carlo (MCTS)", variable=self.ai_choice, value="mcts",
+                           font=("Segoe UI", 12), bg="#1E88E5", fg="white", selectcolor="#1565C0").pack()
+
+            self.use_ponder = tk.BooleanVar(value=False)
+            tk.Checkbutton(self.board_size_window, text="Ponder on my turn", variable=self.use_ponder,
+                           font=("Segoe UI", 12), bg="#1E88E5", fg="white", selectcolor="#1565C0").pack(pady=(5, 0))
+
+
+        tk.Label(self.board_size_window, text="Time per AI move in ms (Alpha-Beta, MCTS):",
+                 font=("Segoe UI", 12, "bold"), fg="white", bg="#1E88E5").pack(pady=(10, 0))
+        self.time_limit_entry = tk.Entry(self.board_size_window, font=("Segoe UI", 12))
+        self.time_limit_entry.pack(pady=5)
+
+        self.use_bitboard = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.board_size_window, text="Bitboard backend", variable=self.use_bitboard,
+                       font=("Segoe UI", 12), bg="#1E88E5", fg="white", selectcolor="#1565C0").pack(pady=(10, 0))
+        self.use_canvas = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.board_size_window, text="Canvas board", variable=self.use_canvas,
+                       font=("Segoe UI", 12), bg="#1E88E5", fg="white", selectcolor="#1565C0").pack()
 
         button = tk.Button(self.board_size_window, text=" Start Game ", font=("Segoe UI", 14, "bold"),
                            command=self.start_game, bg="white")
@@ -387,37 +3113,170 @@ class Menu:
     def start_game(self):
         try:
             board_size = int(self.board_size_entry.get())
+            time_limit = self.time_limit_entry.get().strip()
+            time_limit = int(time_limit) if time_limit else None
+            if time_limit is not None and time_limit <= 0:
+                messagebox.showerror("Invalid Time", "Please enter a positive number of milliseconds.")
+                return
             if 5 <= board_size <= 20:
+                ai_names = [self.ai_choice.get()] if self.selected_mode == "human_vs_ai" else ["minimax", "alphabeta"]
+                if time_limit is not None and not all(uses_time_limit(name) for name in ai_names):
+                    messagebox.showinfo("Time Limit", "Minimax searches a fixed depth and ignores the time limit.")
                 self.board_size_window.destroy()  # Close  board size window
                 self.root.destroy()  # Close  menu window
                 new_root = tk.Tk()
                 ai_mode = self.ai_choice.get() if self.selected_mode == "human_vs_ai" else None
-                GomokuGUI(new_root, board_size, self.selected_mode, ai_mode)
+                board_class = BitBoard if self.use_bitboard.get() else Board
+                renderer = "canvas" if self.use_canvas.get() else "buttons"
+                ponder = self.use_ponder.get() if self.selected_mode == "human_vs_ai" else False
+                GomokuGUI(new_root, board_size, self.selected_mode, ai_mode, board_class, time_limit,
+                          renderer=renderer, ponder=ponder)
                 new_root.mainloop()
             else:
                 messagebox.showerror("Invalid Size", "Please enter a size between 5 and 20.")
         except ValueError:
-            messagebox.showerror("Invalid Input", "Please enter a valid number for the board size.")
+            messagebox.showerror("Invalid Input", "Please enter valid numbers for the board size and time.")
+
+
+STONE_COLORS = {'X': 'red', 'O': 'green'}
+
+
+class ButtonBoardView:
+    """Original renderer: one tk.Button per cell."""
+
+    def __init__(self, parent, board_size, on_click):
+        self.board_size = board_size
+        self.last_move = None
+        self.buttons = [[None for _ in range(board_size)] for _ in range(board_size)]
+        self.board_frame = tk.Frame(parent, bg="#1E88E5")
+        self.board_frame.pack(expand=True)  # frame is centered in the window
+
+        for r in range(board_size):
+            for c in range(board_size):
+                btn = tk.Button(self.board_frame, text=EMPTY_CELL, width=4, height=1,
+                                font=("Arial", 13, "bold"), bg="white", fg="black",
+                                relief="raised", bd=0,
+                                command=partial(on_click, r, c),
+                                activebackground="lightblue", activeforeground="white")
+                btn.grid(row=r, column=c, padx=2, pady=2)
+                self.buttons[r][c] = btn
+
+    def draw_stone(self, row, col, symbol):
+        self.buttons[row][col]['text'] = symbol
+        self.buttons[row][col]['fg'] = STONE_COLORS.get(symbol, 'black')
+        if self.last_move is not None:
+            self.buttons[self.last_move[0]][self.last_move[1]]['bg'] = 'white'
+        self.buttons[row][col]['bg'] = '#FFF59D'
+        self.last_move = (row, col)
+
+    def highlight_win(self, cells):
+        for row, col in cells:
+            self.buttons[row][col]['bg'] = '#FFD54F'
+
+    def clear(self):
+        self.last_move = None
+        for row in self.buttons:
+            for btn in row:
+                btn['text'] = EMPTY_CELL
+                btn['fg'] = 'black'
+                btn['bg'] = 'white'
+
+
+class CanvasBoardView:
+    """Draws the whole board on one tk.Canvas; a move only adds the items for its own cell.
+
+    Clicks are mapped to cells by dividing the click position by the cell size.
+    """
+
+    def __init__(self, parent, board_size, on_click, cell_size=None):
+        self.board_size = board_size
+        self.on_click = on_click
+        screen_height = parent.winfo_screenheight()
+        self.cell = cell_size or max(20, min(44, (screen_height - 220) // board_size))
+        self.margin = self.cell // 2
+        side = 2 * self.margin + self.cell * board_size
+        self.canvas = tk.Canvas(parent, width=side, height=side, bg="#F5DEB3", highlightthickness=0)
+        self.canvas.pack(expand=True)
+        self.canvas.bind("<Button-1>", self.clicked)
+        self.stones = []  # Canvas items drawn for the stones, removed by clear()
+        self.win_items = []
+        self.draw_grid()
+        # One marker rectangle, moved to each new last move instead of redrawing the old cell
+        self.last_marker = self.canvas.create_rectangle(-10, -10, -10, -10, outline="#1E88E5", width=3)
+
+    def draw_grid(self):
+        start, end = self.margin, self.margin + self.cell * self.board_size
+        for i in range(self.board_size + 1):
+            offset = self.margin + i * self.cell
+            self.canvas.create_line(start, offset, end, offset, fill="#8D6E63")
+            self.canvas.create_line(offset, start, offset, end, fill="#8D6E63")
+
+    def cell_box(self, row, col):
+        x, y = self.margin + col * self.cell, self.margin + row * self.cell
+        return x, y, x + self.cell, y + self.cell
+
+    def clicked(self, event):
+        row, col = (event.y - self.margin) // self.cell, (event.x - self.margin) // self.cell
+        if 0 <= row < self.board_size and 0 <= col < self.board_size:
+            self.on_click(row, col)
+
+    def draw_stone(self, row, col, symbol):
+        x1, y1, x2, y2 = self.cell_box(row, col)
+        pad = max(2, self.cell // 8)
+        color = STONE_COLORS.get(symbol, 'black')
+        self.stones.append(self.canvas.create_oval(x1 + pad, y1 + pad, x2 - pad, y2 - pad, outline=color, width=3))
+        self.stones.append(self.canvas.create_text((x1 + x2) // 2, (y1 + y2) // 2, text=symbol, fill=color,
+                                                   font=("Arial", max(8, self.cell // 3), "bold")))
+        self.canvas.coords(self.last_marker, x1 + 1, y1 + 1, x2 - 1, y2 - 1)
+        self.canvas.tag_raise(self.last_marker)
+
+    def highlight_win(self, cells):
+        for row, col in cells:
+            self.win_items.append(self.canvas.create_rectangle(*self.cell_box(row, col), outline="#FFD54F", width=4))
+
+    def clear(self):
+        self.canvas.delete(*self.stones, *self.win_items)
+        self.stones = []
+        self.win_items = []
+        self.canvas.coords(self.last_marker, -10, -10, -10, -10)
+
+
+BOARD_VIEWS = {"buttons": ButtonBoardView, "canvas": CanvasBoardView}
 
 
 class GomokuGUI:
-    def __init__(self, root, board_size, mode, ai_mode=None):
+    def __init__(self, root, board_size, mode, ai_mode=None, board_class=Board, timeLimit=None, workers=None,
+                 renderer="buttons", ponder=False):
         self.root = root
+        self.ponder = ponder  # Search the AI's replies while the human thinks (human vs AI only)
+        self.ponderer = None
+        self.renderer = renderer  # Key of BOARD_VIEWS
+        self.timeLimit = timeLimit  # Milliseconds per AI move, None for fixed-depth search
+        self.workers = workers  # Processes per AI search, None for a serial search
         self.board_size = board_size
         self.root.title("Gomoku Game")
-        self.board = Board(self.board_size)
+        self.board_class = board_class
+        self.board = board_class(self.board_size)
         self.mode = mode
         self.ai_mode = ai_mode
         self.set_players(mode)
-        self.buttons = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.engines = {}  # One engine per AI player, kept for the whole game
+        # Background search: the worker thread, the engine it runs, and its result once finished
+        self.search_thread = None
+        self.search_engine = None
+        self.search_result = None  # Dict the running search fills with its outcome and stats
+        self.search_started = 0.0
+        self.closed = False
         window_width = root.winfo_screenwidth()
         window_height = root.winfo_screenheight()
         root.geometry(f"{window_width}x{window_height}+0+0")
         self.status_label = tk.Label(self.root, text="Welcome to Gomoku!", font=("Arial", 20, "bold"), bg="#1E88E5",
                                      fg="white")
         self.status_label.pack(pady=(10, 0))
+        tk.Button(self.root, text="New Game", font=("Arial", 12, "bold"), command=self.new_game).pack(pady=(5, 0))
 
         self.root.configure(bg="#1E88E5")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.create_widgets()
 
         # To start AI vs AI
@@ -434,79 +3293,230 @@ class GomokuGUI:
         self.current_player = self.player1
 
     def create_widgets(self):
-
-        self.board_frame = tk.Frame(self.root, bg="#1E88E5")
-        self.board_frame.pack(expand=True)  # frame is centered in the window
-
-        for r in range(self.board_size):
-            for c in range(self.board_size):
-                btn = tk.Button(self.board_frame, text=EMPTY_CELL, width=4, height=1,
-                                font=("Arial", 13, "bold"), bg="white", fg="black",
-                                relief="raised", bd=0,
-                                command=partial(self.cell_clicked, r, c),
-                                activebackground="lightblue", activeforeground="white")
-                btn.grid(row=r, column=c, padx=2, pady=2)
-                self.buttons[r][c] = btn
+        self.view = BOARD_VIEWS[self.renderer](self.root, self.board_size, self.cell_clicked)
 
     def cell_clicked(self, row, col):
         if not self.board.is_valid_move(row, col) or self.current_player.is_ai:
             return
 
         self.board.make_move(row, col, self.current_player.symbol)
-        self.buttons[row][col]['text'] = self.current_player.symbol
-        if self.current_player.symbol == 'X':
-            self.buttons[row][col]['fg'] = 'red'
-        elif self.current_player.symbol == 'O':
-            self.buttons[row][col]['fg'] = 'green'
+        self.view.draw_stone(row, col, self.current_player.symbol)
 
         if self.check_game_end():
             return
 
         self.switch_turn()
-        self.root.after(500, self.minMax_move)
+        self.root.after(1, self.minMax_move)
 
+    # Starts the AI search on a worker thread; poll_search picks up the move so Tk keeps repainting
     def minMax_move(self):
-        if self.current_player.is_ai:
-            if self.current_player.ai_name == "minimax":
-                ai = MiniMax(self.board, self.player1, self.player2)
-            elif self.current_player.ai_name == "alphabeta":
-                ai = AlphaBeta(self.board, self.player2, self.player1)
-            else:
+        if self.current_player.is_ai and self.search_thread is None and not self.closed:
+            if self.current_player.symbol not in self.engines:
+                self.engines[self.current_player.symbol] = create_engine(self.current_player.ai_name, self.board,
+                                                                         self.player1, self.player2, self.timeLimit,
+                                                                         self.workers, load_opening_book())
+            ai = self.engines[self.current_player.symbol]
+            if ai is None:
                 return
 
-            bestMove = ai.getBestMove()
-
-            self.board.make_move(bestMove[0], bestMove[1], self.current_player.symbol)
-            self.buttons[bestMove[0]][bestMove[1]]['text'] = self.current_player.symbol
+            ai.clearCancel()  # Cancels meant for an earlier search must not stop this one
+            self.search_engine = ai
+            # Each search writes to its own result, so a cancelled search that finishes late is ignored
+            self.search_result = {}
+            self.search_started = time.perf_counter()
+            self.search_thread = threading.Thread(target=self.run_search,
+                                                  args=(ai, self.board.last_move, self.search_result), daemon=True)
+            self.search_thread.start()
+            self.root.after(50, self.poll_search, self.search_result)
+
+    # Takes the pondered answer to the human's `lastMove` when there is one, else searches; the outcome and
+    # stats go into `result`
+    def run_search(self, ai, lastMove, result):
+        try:
+            if self.ponderer is not None and lastMove is not None:
+                pondered = self.ponderer.take(lastMove)
+                if pondered is not None:
+                    result["stats"] = pondered[1]
+                    result["outcome"] = ("ponder", pondered[0])
+                    return
+            move = ai.getBestMove()
+            result["stats"] = ai.stats
+            result["outcome"] = ("move", move)
+        except SearchCancelled:
+            result["outcome"] = ("cancelled", None)
+        except Exception as error:  # Reported by poll_search, since Tk widgets belong to the main thread
+            result["outcome"] = ("error", error)
+
+    def poll_search(self, result):
+        if result is not self.search_result or self.search_thread is None or self.closed:
+            return
+        if self.search_thread.is_alive():
+            elapsed = time.perf_counter() - self.search_started
+            self.status_label['text'] = (f"🤔 AI {self.current_player.symbol} thinking... "
+                                         f"{self.search_engine.nodes:,} nodes, {elapsed:.1f}s")
+            self.root.after(100, self.poll_search, result)
+            return
+        ai, (outcome, value) = self.search_engine, result["outcome"]
+        self.search_thread = None
+        self.search_engine = None
+        self.search_result = None
+        if outcome in ("move", "ponder"):
+            self.play_ai_move(ai, value, result["stats"], outcome == "ponder")
+        elif outcome == "error":
+            self.status_label['text'] = f"⚠️ AI {self.current_player.symbol} search failed: {value!r}"
+
+    def play_ai_move(self, ai, bestMove, stats, pondered=False):
+        if self.current_player.is_ai:
+            status = f"AI {self.current_player.symbol} played {bestMove}  |  {stats.summary()}"
+            if self.ponderer is not None:
+                status += f"  |  {'hit' if pondered else 'miss'}, {self.ponderer.summary()}"
+            self.status_label['text'] = status
 
-            if self.current_player.symbol == 'X':
-                self.buttons[bestMove[0]][bestMove[1]]['fg'] = 'red'
-            elif self.current_player.symbol == 'O':
-                self.buttons[bestMove[0]][bestMove[1]]['fg'] = 'green'
+            if bestMove is None or not self.board.make_move(bestMove[0], bestMove[1], self.current_player.symbol):
+                self.status_label['text'] = f"⚠️ AI {self.current_player.symbol} returned an unplayable move {bestMove}"
+                return
+            self.view.draw_stone(bestMove[0], bestMove[1], self.current_player.symbol)
 
             if self.check_game_end():
                 return
 
             self.switch_turn()
 
-            self.root.after(500, self.minMax_move)  # AI takes the next turn after a delay
+            if self.current_player.is_ai:
+                self.root.after(1, self.minMax_move)  # Next turn as soon as Tk has drawn this one
+            elif self.ponder:
+                self.start_ponder(ai, stats.pv)
+
+    # Ponders the human's likely moves with a second engine on its own copy of the board
+    def start_ponder(self, ai, pv):
+        if self.ponderer is None:
+            aiPlayer = self.player2 if self.current_player == self.player1 else self.player1
+            self.ponderer = Ponderer(ai, self.board, lambda board: create_engine(aiPlayer.ai_name, board, self.player1,
+                                                                                 self.player2, self.timeLimit, None,
+                                                                                 load_opening_book()))
+        self.ponderer.start(self.current_player.symbol, pv)
+
+    def stop_ponder(self):
+        if self.ponderer is not None:
+            self.ponderer.close()
+            self.ponderer = None
+
+    # Stops an in-flight search; its thread finishes on its own and its result is dropped
+    def cancel_search(self):
+        if self.search_engine is not None:
+            self.search_engine.cancel()
+        self.search_thread = None
+        self.search_engine = None
+        self.search_result = None
+
+    def new_game(self):
+        self.cancel_search()
+        self.stop_ponder()
+        for ai in self.engines.values():
+            if ai is not None:
+                ai.close()
+        self.engines = {}
+        self.board = self.board_class(self.board_size)
+        self.current_player = self.player1
+        self.view.clear()
+        self.status_label['text'] = "Welcome to Gomoku!"
+        if self.player1.is_ai and self.player2.is_ai:
+            self.root.after(500, self.minMax_move)
+
+    def on_close(self):
+        self.closed = True
+        thread = self.search_thread
+        self.cancel_search()
+        self.stop_ponder()
+        if thread is not None:
+            thread.join(timeout=1)
+        for ai in self.engines.values():
+            if ai is not None:
+                ai.close()
+        self.root.destroy()
 
     def switch_turn(self):
         self.current_player = self.player2 if self.current_player == self.player1 else self.player1
 
     def check_game_end(self):
-        if self.board.check_winner(self.current_player.symbol):
+        if self.board.winner == self.current_player.symbol:
+            self.view.highlight_win(self.board.winning_cells())
             messagebox.showinfo("Game Over", f"🏆 Player {self.current_player.symbol} wins!")
             self.root.quit()
             return True
-        elif not self.board.get_empty_cells():
+        elif self.board.is_full():
             messagebox.showinfo("Game Over", "It's a draw!")
             self.root.quit()
             return True
         return False
 
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Gomoku game and engine tools. Run without a command for the GUI.")
+    commands = parser.add_subparsers(dest="command")
+
+    arena = commands.add_parser("arena", help="play engine-vs-engine matches headless")
+    arena.add_argument("engine_a", help="engine spec, e.g. alphabeta:depth=3, alphabeta:time=200 or mcts:iterations=2000")
+    arena.add_argument("engine_b", help="engine spec for the other side")
+    arena.add_argument("--games", type=int, default=10)
+    arena.add_argument("--size", type=int, default=BOARD_SIZE, choices=range(5, 21), metavar="{5..20}")
+    arena.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    arena.add_argument("--opening-moves", type=int, default=2, help="random stones placed before the engines start")
+    arena.add_argument("--seed", type=int, default=0)
+
+    bench = commands.add_parser("bench", help="benchmark Board primitives and engines on the position corpus")
+    bench.add_argument("--positions", default=BENCHMARK_POSITIONS)
+    bench.add_argument("--filter", default="", help="only positions whose name contains this text")
+    bench.add_argument("--output", help="write the results as JSON")
+    bench.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    bench.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    bench.add_argument("--quick", action="store_true", help="shorter timings and no depth-3 searches")
+    bench.add_argument("--ordering", action="store_true", help="also count alpha-beta nodes with ordering on/off")
+    bench.add_argument("--parallel", type=int, default=None, metavar="WORKERS",
+                       help="also time the parallel root search with this many workers against the serial one")
+
+    book = commands.add_parser("book", help="build an opening book with offline alpha-beta searches")
+    book.add_argument("--output", default=OPENING_BOOK)
+    book.add_argument("--size", type=int, default=BOARD_SIZE, choices=range(5, 21), metavar="{5..20}")
+    book.add_argument("--plies", type=int, default=4, help="stones deep the book reaches")
+    book.add_argument("--branching", type=int, default=3, help="best moves expanded from each position")
+    book.add_argument("--depth", type=int, default=3, help="search depth per position")
+    book.add_argument("--time", type=int, default=None, help="milliseconds per position instead of a fixed depth")
+
+    serve = commands.add_parser("serve", help="run the engine server (line protocol over TCP or stdin/stdout)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT)
+    serve.add_argument("--stdio", action="store_true", help="serve a single game on stdin/stdout")
+    serve.add_argument("--workers", type=int, default=None, help="search processes (default: one per CPU)")
+    serve.add_argument("--queue", type=int, default=None, help="searches queued or running (default: 4 per worker)")
+    serve.add_argument("--engine", default="alphabeta:time=1000", help="default engine spec for new games")
+    serve.add_argument("--time", type=int, default=1000, help="default milliseconds per move, 0 for no limit")
+
+    loadtest = commands.add_parser("loadtest", help="run concurrent client games against a local engine server")
+    loadtest.add_argument("--games", type=int, default=8)
+    loadtest.add_argument("--size", type=int, default=BOARD_SIZE, choices=range(5, 21), metavar="{5..20}")
+    loadtest.add_argument("--moves", type=int, default=10, help="client moves per game")
+    loadtest.add_argument("--time", type=int, default=200, help="milliseconds per engine move")
+    loadtest.add_argument("--workers", type=int, default=None)
+    loadtest.add_argument("--queue", type=int, default=None)
+    loadtest.add_argument("--engine", default=None, help="engine spec sent with INFO engine")
+    loadtest.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    Menu(root)
-    root.mainloop()
+    args = parse_args(sys.argv[1:])
+    if args.command == "arena":
+        arena_main(args)
+    elif args.command == "bench":
+        sys.exit(bench_main(args))
+    elif args.command == "book":
+        book_main(args)
+    elif args.command == "serve":
+        serve_main(args)
+    elif args.command == "loadtest":
+        load_test_main(args)
+    else:
+        root = tk.Tk()
+        Menu(root)
+        root.mainloop()
@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Imported under its own module name so the worker processes of the parallel searches can find it
+import Gen_Ahmed_20221053_20221084_20221146_20221177_20221217_S3 as gomoku  # noqa: E402
+
+with open(os.path.join(ROOT, "benchmark_positions.json")) as file:
+    POSITIONS = {position["name"]: position for position in json.load(file)}
+
+
+@pytest.fixture
+def position_board():
+    """Builds (board, player to move, opponent) for a position of benchmark_positions.json."""
+    def build(name, board_class=gomoku.Board):
+        position = POSITIONS[name]
+        board = gomoku.load_position(position["rows"], board_class)
+        player = gomoku.Player(position["to_move"])
+        return board, player, gomoku.Player('O' if player.symbol == 'X' else 'X')
+    return build
+
+
+@pytest.fixture
+def search(position_board):
+    """Runs one search on a corpus position and returns (move, score, nodes)."""
+    def run(engine_class, name, **options):
+        board, player, opponent = position_board(name)
+        engine = engine_class(board, player, opponent, **options)
+        try:
+            move = engine.getBestMove()
+        finally:
+            engine.close()
+        return move, engine.stats.bestScore, engine.nodes
+    return run
@@ -0,0 +1,35 @@
+"""Scoring the leaf children of depth-1 nodes in one NumPy batch must not change any search result."""
+import pytest
+
+from conftest import gomoku
+
+pytestmark = pytest.mark.skipif(gomoku.np is None, reason="batch evaluation needs NumPy")
+
+POSITIONS = ["opening-9-2", "middlegame-9-1", "opening-15-2", "middlegame-15-1", "tactical-15-stop-fork"]
+
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_batched_alphabeta_matches_one_by_one(search, name):
+    batched = search(gomoku.AlphaBeta, name, maxDepth=3, threatSearch=False)
+    single = search(gomoku.AlphaBeta, name, maxDepth=3, threatSearch=False, batchEvaluation=False)
+    assert batched == single  # Move, score and node count
+
+
+@pytest.mark.parametrize("name", POSITIONS)
+@pytest.mark.parametrize("depth", [1, 2])
+def test_batched_minimax_matches_one_by_one(search, name, depth):
+    batched = search(gomoku.MiniMax, name, maxDepth=depth)
+    single = search(gomoku.MiniMax, name, maxDepth=depth, batchEvaluation=False)
+    assert batched == single
+
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_batch_evaluate_matches_board(position_board, name):
+    board, player, _ = position_board(name)
+    moves = board.get_candidate_moves()
+    scores, wins = gomoku.batch_evaluate(board.to_array(), moves, player.symbol)
+    for (row, col), score, win in zip(moves, scores.tolist(), wins.tolist()):
+        board.make_move(row, col, player.symbol)
+        assert win == (board.winner == player.symbol)
+        assert score == board.evaluate('X')
+        board.undo_move()
@@ -0,0 +1,76 @@
+"""The engine server, driven over TCP by EngineClient against a server on a free local port."""
+import asyncio
+
+from conftest import gomoku
+
+
+def run_with_server(scenario, **options):
+    async def main():
+        server = gomoku.EngineServer(**options)
+        tcp = await server.serveTcp(port=0)
+        port = tcp.sockets[0].getsockname()[1]
+        try:
+            return await scenario(server, port)
+        finally:
+            tcp.close()
+            await tcp.wait_closed()
+            server.close()
+    return asyncio.run(main())
+
+
+def cell(reply):
+    move = gomoku._parse_cell(reply)
+    assert move is not None, reply
+    return move
+
+
+def test_protocol_game():
+    async def scenario(server, port):
+        client = await gomoku.EngineClient.connect(port=port)
+        assert await client.request("TURN 1,1") == "ERROR no game started"
+        assert await client.request("START 9") == "OK"
+        await client.send("INFO engine alphabeta:depth=2")
+        first = cell(await client.request("BEGIN"))
+        assert await client.request(f"TURN {first[0]},{first[1]}") == "ERROR invalid move"
+        assert await client.request("TURN 9,0") == "ERROR invalid move"
+        assert await client.request("TURN x") == "ERROR TURN needs row,col"
+        reply = cell(await client.request("TURN 0 0"))
+        assert reply not in (first, (0, 0))
+        bad = await client.request("BOARD", "4,4,1", "4,5,1", "DONE")
+        assert bad == "ERROR BOARD stone counts do not fit the engine to move"
+        move = cell(await client.request("BOARD", "4,4,2", "DONE"))
+        assert move != (4, 4)
+        assert await client.request("RESTART") == "OK"
+        cell(await client.request("BEGIN"))
+        assert await client.request("FOO") == "ERROR unknown command FOO"
+        stats = await client.request("STATS")
+        await client.close()
+        return stats
+
+    stats = run_with_server(scenario, workers=1, timeLimit=200)
+    assert stats.startswith("MESSAGE requests=4 rejected=0 ")
+    assert "p50_ms=" in stats and "p99_ms=" in stats and "throughput=" in stats
+
+
+def test_busy_turn_can_be_resent():
+    async def scenario(server, port):
+        slow = await gomoku.EngineClient.connect(port=port)
+        fast = await gomoku.EngineClient.connect(port=port)
+        for client in (slow, fast):
+            assert await client.request("START 9") == "OK"
+        await slow.send("INFO timeout_turn 0", "INFO engine mcts:iterations=800")
+        await fast.send("INFO timeout_turn 50")
+        # The only search slot goes to the slow game, so the fast one cannot get it within 50 ms
+        pending = asyncio.ensure_future(slow.request("TURN 4,4"))
+        await asyncio.sleep(0.05)
+        assert await fast.request("TURN 4,4") == "ERROR busy"
+        cell(await pending)
+        await fast.send("INFO timeout_turn 1000")
+        cell(await fast.request("TURN 4,4"))  # Same stone again: the busy TURN left no trace
+        stats = server.stats()
+        for client in (slow, fast):
+            await client.close()
+        return stats
+
+    stats = run_with_server(scenario, workers=1, queueSize=1)
+    assert stats["rejected"] == 1 and stats["requests"] == 2
@@ -0,0 +1,53 @@
+"""The incremental board state must always equal a full recomputation, across any make/undo sequence."""
+import random
+
+import pytest
+
+from conftest import gomoku
+
+
+# Random games with random take-backs; `check` runs after every make_move and undo_move
+def play_random_games(board_class, size, check, games=5):
+    rng = random.Random(size)
+    for _ in range(games):
+        board = board_class(size)
+        symbol = 'X'
+        for _ in range(rng.randint(10, 40)):
+            if board.winner is not None or board.is_full():
+                break
+            # Mostly near the stones, sometimes anywhere, so far-apart groups are covered too
+            cells = board.get_candidate_moves() if rng.random() < 0.8 else board.get_empty_cells()
+            row, col = rng.choice(cells)
+            board.make_move(row, col, symbol)
+            check(board)
+            if rng.random() < 0.3:
+                board.undo_move()
+                check(board)
+            else:
+                symbol = 'O' if symbol == 'X' else 'X'
+        while board.history:
+            board.undo_move()
+            check(board)
+        assert board.hash == board_class(size).hash
+
+
+def check_scores(board):
+    for symbol in ('X', 'O'):
+        assert board.evaluate(symbol) == board.evaluate_full(symbol)
+
+
+@pytest.mark.parametrize("board_class", [gomoku.Board, gomoku.BitBoard])
+@pytest.mark.parametrize("size", [9, 15])
+def test_incremental_scores_match_full_evaluation(board_class, size):
+    play_random_games(board_class, size, check_scores)
+
+
+def check_frontier(board):
+    if board.stone_count:
+        assert sorted(board.get_candidate_moves()) == sorted(board._scan_candidate_moves(board.candidate_distance))
+
+
+@pytest.mark.parametrize("board_class", [gomoku.Board, gomoku.BitBoard])
+@pytest.mark.parametrize("size", [9, 15])
+def test_frontier_matches_candidate_scan(board_class, size):
+    play_random_games(board_class, size, check_frontier)
@@ -0,0 +1,19 @@
+"""MonteCarlo keeps a live node count for the GUI's thinking indicator."""
+from conftest import gomoku
+
+
+class RecordingMonteCarlo(gomoku.MonteCarlo):
+    """Records self.nodes before every iteration, as another thread polling it would see it."""
+
+    def iterate(self):
+        self.seen.append(self.nodes)
+        super().iterate()
+
+
+def test_nodes_count_iterations_during_search(position_board):
+    board, player, opponent = position_board("middlegame-9-1")
+    engine = RecordingMonteCarlo(board, player, opponent, iterations=50, threatSearch=False)
+    engine.seen = []
+    engine.getBestMove()
+    assert engine.seen == list(range(50))
+    assert engine.nodes == engine.stats.iterations == 50
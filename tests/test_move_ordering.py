@@ -0,0 +1,25 @@
+"""Move ordering may only change how many nodes alpha-beta visits, never the score it finds."""
+import pytest
+
+from conftest import gomoku
+
+POSITIONS = ["opening-9-2", "middlegame-9-1", "opening-15-1", "middlegame-15-2", "tactical-15-four"]
+
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_ordering_keeps_the_score_and_saves_nodes(position_board, name):
+    board, player, opponent = position_board(name)
+    moves = board.move_list()
+    result = gomoku.compare_move_ordering(board, player, opponent, depth=2)
+    assert board.move_list() == moves
+    assert result["on"]["score"] == result["off"]["score"]
+    assert result["on"]["nodes"] < result["off"]["nodes"]
+    assert result["node_reduction"] > 0.5
+
+
+def test_bench_reports_ordering():
+    results = gomoku.run_benchmarks([dict(name="tiny", size=9, to_move="X",
+                                          rows=["." * 9] * 4 + ["....X...."] + ["." * 9] * 4)],
+                                    quick=True, ordering=True)
+    entry = results["ordering"]["tiny/alphabeta:depth=2"]
+    assert entry["on"]["nodes"] <= entry["off"]["nodes"]
@@ -0,0 +1,42 @@
+"""Book moves must not depend on which of the 8 symmetric orientations a position is seen in."""
+from conftest import gomoku
+
+SIZE = 9
+
+
+def book_positions(book, board, plies, positions):
+    """Collects {canonical hash: move list} of the book positions reachable from `board` within `plies` moves."""
+    key = board.canonical_hash()[0]
+    if key in positions or book.lookup(board) is None:
+        return positions
+    positions[key] = board.move_list()
+    if plies > 1:
+        symbol = 'X' if len(board.history) % 2 == 0 else 'O'
+        for row, col in sorted(board.get_candidate_moves()):
+            board.make_move(row, col, symbol)
+            book_positions(book, board, plies - 1, positions)
+            board.undo_move()
+    return positions
+
+
+def test_lookup_agrees_across_symmetries(tmp_path):
+    path = str(tmp_path / "book.bin")
+    count = gomoku.build_opening_book(path, SIZE, plies=3, branching=2, depth=1)
+    book = gomoku.OpeningBook(path)
+    try:
+        positions = book_positions(book, gomoku.Board(SIZE), 3, {})
+        assert len(positions) == count
+        for moves in positions.values():
+            symbol = 'X' if len(moves) % 2 == 0 else 'O'
+            canonical = set()
+            for mapping in gomoku.board_symmetries(SIZE):
+                board = gomoku.Board(SIZE)
+                for row, col, who in moves:
+                    board.make_move(*divmod(mapping[row * SIZE + col], SIZE), who)
+                move = book.lookup(board)
+                assert move is not None
+                board.make_move(*move, symbol)
+                canonical.add(board.canonical_hash()[0])
+            assert len(canonical) == 1
+    finally:
+        book.close()
@@ -0,0 +1,30 @@
+"""The parallel root searches must pick the move and score the serial searches pick."""
+import pytest
+
+from conftest import gomoku
+
+POSITIONS = ["opening-9-2", "middlegame-9-1", "opening-15-2"]
+
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_parallel_alphabeta_picks_the_serial_move(search, name):
+    serial = search(gomoku.AlphaBeta, name, maxDepth=2, threatSearch=False)
+    parallel = search(gomoku.AlphaBeta, name, maxDepth=2, threatSearch=False, workers=2)
+    assert parallel[:2] == serial[:2]
+
+
+@pytest.mark.parametrize("name", POSITIONS)
+def test_parallel_minimax_picks_the_serial_move(search, name):
+    serial = search(gomoku.MiniMax, name, maxDepth=1)
+    parallel = search(gomoku.MiniMax, name, maxDepth=1, workers=2)
+    assert parallel[:2] == serial[:2]
+
+
+@pytest.mark.parametrize("engine", ["alphabeta", "minimax"])
+def test_compare_parallel_search_reports_the_same_move(position_board, engine):
+    board, player, opponent = position_board("middlegame-9-1")
+    moves = board.move_list()
+    result = gomoku.compare_parallel_search(board, player, opponent, depth=1 if engine == "minimax" else 2,
+                                            workers=2, engine=engine)
+    assert result["same_move"] and result["workers"] == 2 and result["speedup"] > 0
+    assert board.move_list() == moves
@@ -0,0 +1,16 @@
+"""The cached pattern table is rebuilt when stale and replaced in one step."""
+import os
+
+from conftest import gomoku
+
+
+def test_stale_table_is_rebuilt_atomically(tmp_path, monkeypatch):
+    table = gomoku.pattern_table()
+    path = tmp_path / "line_patterns.bin"
+    path.write_bytes(gomoku.PATTERN_TABLE_HEADER.pack(gomoku.PATTERN_TABLE_MAGIC, 0) + table)
+    monkeypatch.setattr(gomoku, "PATTERN_TABLE_PATH", str(path))
+    monkeypatch.setattr(gomoku, "_PATTERN_TABLE", None)
+    assert gomoku.pattern_table() == table
+    header = gomoku.PATTERN_TABLE_HEADER.pack(gomoku.PATTERN_TABLE_MAGIC, gomoku.PATTERN_TABLE_VERSION)
+    assert path.read_bytes() == header + table
+    assert os.listdir(tmp_path) == [path.name]  # No temporary file left behind
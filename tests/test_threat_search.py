@@ -0,0 +1,55 @@
+"""The threat search must find forced wins and blocks, and its cache may not hide a deeper win."""
+import pytest
+
+from conftest import gomoku
+
+# X to move wins with fours only: no single move makes two fours, but every four X needs is on the board.
+VCF_ROWS = [
+    "...............",
+    "...............",
+    "...............",
+    ".........O.....",
+    ".........X.....",
+    ".........X.....",
+    "..........XXXO.",
+    ".....OXXX......",
+] + ["..............."] * 7
+
+
+@pytest.mark.parametrize("name", ["tactical-9-four", "tactical-15-four", "tactical-20-four"])
+def test_four_is_won_or_blocked(position_board, name):
+    board, player, opponent = position_board(name)
+    threats = gomoku.ThreatSearch(board)
+    # The player to move faces the opponent's four: it must block it, and the opponent would complete it
+    block, kind = threats.solve(player.symbol, opponent.symbol)
+    assert kind == "block"
+    win, kind = threats.solve(opponent.symbol, player.symbol)
+    assert kind == "win" and win == block
+    board.make_move(*win, opponent.symbol)
+    assert board.winner == opponent.symbol
+
+
+def test_vcf_line_wins():
+    board = gomoku.load_position(VCF_ROWS)
+    threats = gomoku.ThreatSearch(board, vctDepth=0)
+    for _ in range(threats.vcfDepth):
+        move, kind = threats.solve('X', 'O')
+        assert kind in ("vcf", "win")
+        board.make_move(*move, 'X')
+        if board.winner is not None:
+            break
+        # Every attacking move is a four, so the defender has exactly one reply
+        block, kind = threats.solve('O', 'X')
+        assert kind == "block"
+        board.make_move(*block, 'O')
+    assert board.winner == 'X'
+
+
+def test_shallow_failure_does_not_hide_deeper_win():
+    board = gomoku.load_position(VCF_ROWS)
+    threats = gomoku.ThreatSearch(board, vcfDepth=1, vctDepth=0)
+    assert threats.solve('X', 'O') == (None, None)
+    assert not threats.aborted
+    threats.vcfDepth = 2
+    move, kind = threats.solve('X', 'O')
+    assert kind == "vcf" and move is not None
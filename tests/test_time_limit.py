@@ -0,0 +1,36 @@
+"""A per-move time limit covers the whole move, threat search included."""
+import time
+
+import pytest
+
+from conftest import gomoku
+
+TIME_LIMIT = 200  # Milliseconds
+SLACK = 0.15  # Seconds allowed past the limit for the depth-1 iteration and the last deadline check
+
+
+class SlowThreats(gomoku.ThreatSearch):
+    """Uses up every millisecond the search gives it without finding anything."""
+
+    def solve(self, attacker, defender, deadline=None):
+        self.nodes = 0
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        return None, None
+
+
+@pytest.mark.parametrize("engine_class", [gomoku.AlphaBeta, gomoku.MonteCarlo])
+def test_threat_search_counts_against_the_limit(position_board, engine_class):
+    board, player, opponent = position_board("middlegame-9-1")
+    engine = engine_class(board, player, opponent, timeLimit=TIME_LIMIT)
+    engine.threats = SlowThreats(board)
+    try:
+        move = engine.getBestMove()
+    finally:
+        engine.close()
+    assert board.is_valid_move(*move)
+    assert engine.stats.seconds < TIME_LIMIT / 1000 + SLACK
+
+
+def test_minimax_reports_it_ignores_the_time_limit():
+    assert not gomoku.uses_time_limit("minimax")
+    assert gomoku.uses_time_limit("alphabeta") and gomoku.uses_time_limit("mcts")